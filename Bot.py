@@ -0,0 +1,211 @@
+import random
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from Game import MemoryGame
+from Utils import ANIMATION_DURATION
+
+
+class Strategy:
+    """Base class for bot strategies.
+
+    A strategy only learns about cards through observe(), i.e. the same
+    information a human gets from looking at face-up cards.
+    """
+    name = 'base'
+
+    def reset(self) -> None:
+        """Forget everything before a new game."""
+
+    def observe(self, index: int, symbol: str) -> None:
+        """Record that the card at index was seen showing symbol."""
+
+    def forget(self, index: int) -> None:
+        """Drop a card from memory once it has been matched."""
+
+    def choose(self, game: MemoryGame) -> int:
+        """Return the index of the next card to click."""
+        raise NotImplementedError
+
+
+def face_down_cards(game: MemoryGame) -> List[int]:
+    """Indices of cards that can still be clicked."""
+    return [i for i in range(len(game.cards))
+            if i not in game.flipped_cards and i not in game.matched_pairs]
+
+
+class RandomStrategy(Strategy):
+    """Click any face-down card at random, remembering nothing."""
+    name = 'random'
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def choose(self, game: MemoryGame) -> int:
+        return self.rng.choice(face_down_cards(game))
+
+
+class MemoryStrategy(Strategy):
+    """Remember up to `capacity` cards, evicting the least recently seen.
+
+    With no capacity the bot never forgets, which is the perfect-memory
+    player the solver measures against.
+    """
+    name = 'memory'
+
+    def __init__(self, capacity: Optional[int] = None, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.rng = random.Random(seed)
+        self.memory: 'OrderedDict[int, str]' = OrderedDict()
+
+    def reset(self) -> None:
+        self.memory.clear()
+
+    def observe(self, index: int, symbol: str) -> None:
+        self.memory[index] = symbol
+        self.memory.move_to_end(index)
+        if self.capacity is not None and len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def forget(self, index: int) -> None:
+        self.memory.pop(index, None)
+
+    def choose(self, game: MemoryGame) -> int:
+        candidates = face_down_cards(game)
+        if game.flipped_cards:
+            # Second card: complete the pair from memory if we can
+            symbol = game.cards[game.flipped_cards[0]]
+            for index in candidates:
+                if self.memory.get(index) == symbol:
+                    return index
+        else:
+            # First card: start with a pair we already know
+            seen: Dict[str, int] = {}
+            for index in candidates:
+                symbol = self.memory.get(index)
+                if symbol is None:
+                    continue
+                if symbol in seen:
+                    return seen[symbol]
+                seen[symbol] = index
+        unknown = [i for i in candidates if i not in self.memory]
+        return self.rng.choice(unknown or candidates)
+
+
+class PerfectMemoryStrategy(MemoryStrategy):
+    """Never forget a card."""
+    name = 'perfect'
+
+    def __init__(self, seed: Optional[int] = None):
+        super().__init__(None, seed)
+
+
+class ForgetfulStrategy(MemoryStrategy):
+    """Remember only the last `capacity` cards seen."""
+    name = 'forgetful'
+
+    def __init__(self, capacity: int = 4, seed: Optional[int] = None):
+        super().__init__(capacity, seed)
+        self.name = f'forgetful-{capacity}'
+
+
+STRATEGIES = {
+    'random': RandomStrategy,
+    'perfect': PerfectMemoryStrategy,
+    'forgetful': ForgetfulStrategy,
+}
+
+
+class BotPlayer:
+    """Drive a MemoryGame through handle_card_click with a strategy.
+
+    Pass click to route clicks elsewhere, e.g. MemoryGameUI.on_card_clicked.
+    """
+
+    def __init__(self, game: MemoryGame, strategy: Strategy,
+                 click: Optional[Callable[[int], None]] = None):
+        self.game = game
+        self.strategy = strategy
+        self.click = click or game.handle_card_click
+        self.clicks = 0
+
+    def reset(self) -> None:
+        self.strategy.reset()
+        self.clicks = 0
+
+    def step(self) -> bool:
+        """Click one card. Returns False while the game is busy or finished."""
+        if self.game.is_processing or self.game.is_complete():
+            return False
+        index = self.strategy.choose(self.game)
+        symbol = self.game.get_card_symbol(index)
+        self.click(index)
+        self.clicks += 1
+        self.strategy.observe(index, symbol)
+        if self.game.is_card_matched(index):
+            for matched in self.game.matched_pairs[-2:]:
+                self.strategy.forget(matched)
+        return True
+
+
+class HeadlessUI:
+    """Minimal ui_callback for a headless MemoryGame.
+
+    Mismatches go through the normal schedule_card_flip_back/flip_cards_back
+    flow, just without waiting for the animation. The waits are added up in
+    simulated_ms instead: what the game would have taken on screen.
+    """
+
+    def __init__(self):
+        self.game = None
+        self.completed = False
+        self.simulated_ms = 0
+
+    def update_score(self, score: int, player: Optional[int] = None) -> None:
+        pass
+
+    def update_moves(self, moves: int, player: Optional[int] = None) -> None:
+        pass
+
+    def update_turn(self, player: int) -> None:
+        pass
+
+    def reset_cards(self) -> None:
+        self.completed = False
+        self.simulated_ms = 0
+
+    def flip_card(self, index: int, symbol: str, is_front: bool) -> None:
+        if is_front:
+            self.simulated_ms += ANIMATION_DURATION
+
+    def schedule_card_flip_back(self, card_indices) -> None:
+        self.simulated_ms += self.game.flip_back_delay
+        self.game.flip_cards_back()
+
+    def cancel_card_flip_back(self) -> None:
+        pass
+
+    def show_game_complete(self) -> None:
+        self.completed = True
+
+
+def play_headless(strategy: Strategy, grid_size: int = 4, seed: Optional[int] = None) -> Dict[str, float]:
+    """Play one full game at full speed and return its result."""
+    ui = HeadlessUI()
+    game = MemoryGame(ui, headless=True, grid_size=grid_size, seed=seed)
+    ui.game = game
+    bot = BotPlayer(game, strategy)
+    bot.reset()
+    start = time.perf_counter()
+    while bot.step():
+        pass
+    return {
+        'strategy': strategy.name,
+        'grid_size': grid_size,
+        'seed': seed,
+        'moves': game.moves,
+        'clicks': bot.clicks,
+        'efficiency': game.efficiency,
+        'seconds': time.perf_counter() - start,
+        'game_seconds': ui.simulated_ms / 1000,
+    }
@@ -0,0 +1,45 @@
+from PyQt5.QtCore import QTimer
+from Bot import BotPlayer, Strategy
+from Game import MemoryGame
+
+
+class BotDriver:
+    """Play a bot inside the GUI at a fixed cadence.
+
+    Each tick clicks at most one card; ticks that land while a mismatch is
+    waiting for schedule_card_flip_back are skipped, so the real animation
+    timing is preserved.
+
+    Like the game's clock, the bot only plays while the game is active:
+    pause() and resume() follow MemoryGame's.
+    """
+
+    def __init__(self, game: MemoryGame, strategy: Strategy, interval: int = 300):
+        self.bot = BotPlayer(game, strategy)
+        self.running = False
+        self.timer = QTimer()
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.tick)
+
+    def start(self) -> None:
+        self.bot.reset()
+        self.running = True
+        if not self.bot.game.paused:
+            self.timer.start()
+
+    def stop(self) -> None:
+        self.running = False
+        self.timer.stop()
+
+    def pause(self) -> None:
+        self.timer.stop()
+
+    def resume(self) -> None:
+        if self.running:
+            self.timer.start()
+
+    def tick(self) -> None:
+        if self.bot.game.is_complete():
+            self.stop()
+            return
+        self.bot.step()
@@ -0,0 +1,175 @@
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+from PyQt5.QtCore import QRectF, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton, QStyle, QStyleOption
+from PyQt5.QtGui import QFont, QPainter
+from SymbolAtlas import FACE, atlas_for
+from Utils import CARD_SIZE, CARD_BACK_COLOR, CARD_FRONT_COLOR
+
+def create_card_button(symbol: str) -> QPushButton:
+    """Create a styled card button."""
+    button = QPushButton('?')
+    button.setFixedSize(CARD_SIZE, CARD_SIZE)
+    button.setFont(QFont('Arial', 24))
+    button.setStyleSheet(f"""
+        QPushButton {{
+            background-color: {CARD_BACK_COLOR};
+            color: white;
+            border-radius: 8px;
+            border: none;
+        }}
+        QPushButton:hover {{
+            background-color: #357abd;
+        }}
+    """)
+    return button
+
+class CardBoard(QWidget):
+    """A grid of card buttons that can be rebuilt or turned face down in slices.
+
+    The board remembers which cards are face up, so resetting it only restyles
+    those cards. MemoryGameUI keeps two boards and prepares the hidden one
+    while the player is idle, so a new game is a swap instead of a rebuild.
+
+    Face-up buttons are transparent: the board paints every face under them
+    from the symbol atlas in one call. Image symbols from a pack come from a
+    second atlas holding just the deal's images, decoded in the background
+    (set_deal_faces). Symbols in neither fall back to button text, as do
+    images turned up before decoding finishes; those are redrawn from the
+    atlas once it is ready.
+    """
+    faces_ready = pyqtSignal(object)  # the decoded deal's future, from the decoder thread
+
+    def __init__(self, on_click: Callable[[int], None], parent=None):
+        super().__init__(parent)
+        self.setObjectName("grid_container")
+        self.on_click = on_click
+        self.grid = QGridLayout(self)
+        self.grid.setSpacing(10)
+        self.cards: List = []
+        self.grid_size = 0
+        self.face_up: Dict[int, str] = {}  # index -> symbol
+        self.card_size = 0
+        self.atlas = None
+        self.deal_faces: Optional[Future] = None
+        self.faces_ready.connect(self.on_faces_ready)
+
+    def build(self, grid_size: int):
+        """Replace the cards with a face-down grid of the given size."""
+        for card in self.cards:
+            self.grid.removeWidget(card)
+            card.deleteLater()
+        self.cards = []
+        self.face_up.clear()
+        self.deal_faces = None
+        self.grid_size = grid_size
+        card_size = self.card_size = min(100, 1000 // (grid_size + 1))
+        self.atlas = atlas_for(card_size, self.devicePixelRatioF())
+
+        for i in range(grid_size * grid_size):
+            row, col = divmod(i, grid_size)
+            card = create_card_button('?')
+            card.setFixedSize(card_size, card_size)
+            card.setFont(QFont('Arial', card_size // 2))
+            card.clicked.connect(lambda checked, idx=i: self.on_click(idx))
+            self.style_back(card)
+            self.grid.addWidget(card, row, col)
+            self.cards.append(card)
+
+    def is_ready(self, grid_size: int) -> bool:
+        """True if the board is built for grid_size with every card face down."""
+        return bool(self.cards) and self.grid_size == grid_size and not self.face_up
+
+    def set_deal_faces(self, faces: Optional[Future]):
+        """Use the atlas the future resolves to for the symbols the built-in one lacks."""
+        self.deal_faces = faces
+        if faces:
+            # Emitted from the decoder thread, so the slot runs on the GUI thread
+            faces.add_done_callback(self.faces_ready.emit)
+
+    def on_faces_ready(self, faces: Future):
+        if faces is not self.deal_faces:
+            return  # decoded for an earlier deal
+        for index, symbol in list(self.face_up.items()):
+            self.set_face(index, symbol, True)
+
+    def atlas_of(self, symbol: str):
+        """The atlas that can draw symbol, or None."""
+        if symbol in self.atlas:
+            return self.atlas
+        if self.deal_faces and self.deal_faces.done():
+            # Never wait for it: the card shows its id until on_faces_ready
+            atlas = self.deal_faces.result()
+            if symbol in atlas:
+                return atlas
+        return None
+
+    def set_face(self, index: int, symbol: str, is_front: bool):
+        """Show a card's symbol or turn it face down."""
+        card = self.cards[index]
+        if is_front:
+            if self.atlas_of(symbol):
+                card.setText('')
+                card.setStyleSheet("QPushButton { background-color: transparent; border: none; }")
+            else:
+                card.setText(symbol)
+                card.setStyleSheet(f"""
+                    QPushButton {{
+                        background-color: {CARD_FRONT_COLOR};
+                        color: black;
+                        border-radius: 8px;
+                        border: none;
+                        font-size: {card.height() // 2}px;
+                    }}
+                """)
+            self.face_up[index] = symbol
+        else:
+            self.style_back(card)
+            self.face_up.pop(index, None)
+        self.update(card.geometry())
+
+    def reset_faces(self, budget: int = 0) -> bool:
+        """Turn face-up cards back down, at most `budget` of them (0 = all).
+
+        Returns True once every card is face down.
+        """
+        flipped = 0
+        while self.face_up and (not budget or flipped < budget):
+            index, _ = self.face_up.popitem()
+            self.style_back(self.cards[index])
+            flipped += 1
+        self.update()
+        return not self.face_up
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        # Keep the stylesheet's background, then the faces on top
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PE_Widget, option, painter, self)
+        if not self.atlas:
+            return
+        cells = {}
+        for index, symbol in self.face_up.items():
+            atlas = self.atlas_of(symbol)
+            if atlas:
+                target = QRectF(self.cards[index].geometry())
+                cells.setdefault(atlas, []).extend(((FACE, target), (symbol, target)))
+        for atlas, atlas_cells in cells.items():
+            atlas.draw(painter, atlas_cells)
+
+    @staticmethod
+    def style_back(card):
+        card.setText('?')
+        card.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {CARD_BACK_COLOR};
+                color: white;
+                border-radius: 8px;
+                border: none;
+                font-size: {card.height() // 2}px;
+            }}
+            QPushButton:hover {{
+                background-color: #357abd;
+            }}
+        """)
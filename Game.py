@@ -1,90 +1,238 @@
 from typing import List, Optional, Tuple
-from Utils import create_card_pairs, get_card_position
-from PyQt5.QtCore import QTimer
-from ParticleEffect import ParticleEffect
+from Utils import create_card_pairs, deal_seed, ANIMATION_DURATION, MIN_FLIP_BACK
 from Settings import Settings
+from Solver import efficiency
+from Turns import TurnEngine
+from Tracing import traced
+from SaveGame import GameSnapshot
 import random
+import time
 
 class MemoryGame:
-    def __init__(self, ui_callback):
+    def __init__(self, ui_callback, headless: bool = False, grid_size: Optional[int] = None,
+                 seed: Optional[int] = None, players: int = 1, timer=None, particle_effect=None,
+                 saver=None):
+        """Create a game driven by ui_callback.
+
+        The rules have no Qt dependency. A GUI passes in its own timer
+        (anything with start(ms) and stop(), wired to update_time) and
+        particle effect; without them the callback only needs the
+        notification methods. A headless game also skips reloading
+        settings, so bots and simulations can play at full speed.
+
+        The clock is monotonic and only runs while the game is active;
+        pause() and resume() stop and restart it along with the timer and
+        particles, e.g. while the game screen is hidden.
+
+        With more than one player, turns pass on a miss and the callback's
+        update_score/update_moves receive the player whose counters changed.
+
+        Clicks are never dropped while a mismatch is showing: the next click
+        flips the pair back at once and is then applied. How long a mismatch
+        stays visible (flip_back_delay, ms) follows the player's pace.
+
+        A saver (a SaveGame.GameSaver) gets a snapshot after every move and
+        pause, so a single-player game can be put back with restore().
+        """
         self.ui_callback = ui_callback
-        self.settings = Settings()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
+        self.headless = headless
+        self.grid_size = grid_size
+        self.players = players
+        self.settings = None if headless else Settings()
         self.time = 0
-        self.particle_effect = ParticleEffect(self.ui_callback.game_widget)
-        self.reset_game()
+        self.started_at = 0.0
+        self.active_time = 0.0  # seconds played before the last resume
+        self.paused = True
+        self.is_processing = False
+        self.flip_back_delay = ANIMATION_DURATION
+        self.pair_pace: Optional[float] = None  # smoothed seconds between a pair's clicks
+        self.first_click_at = 0.0
+        self.last_click_at = 0.0
+        self.timer = timer
+        self.particle_effect = particle_effect
+        self.saver = saver
+        self.reset_game(seed)
+
+    def reset_game(self, seed: Optional[int] = None, cards: Optional[List[str]] = None) -> None:
+        """Reset the game state, optionally dealing a reproducible board.
 
-    def reset_game(self) -> None:
-        """Reset the game state."""
+        cards is a deal prepared ahead of time, used instead of dealing now;
+        seed should then be the one it was dealt from. Unseeded deals get a
+        fresh seed so the game can still be saved.
+        """
         # Reload settings to ensure we have the latest values
-        self.settings = Settings()
-        self.cards = create_card_pairs()
+        if not self.headless:
+            self.settings = Settings()
+        # A flip-back scheduled for the old board must not touch the new one
+        if self.is_processing:
+            self.ui_callback.cancel_card_flip_back()
+        if cards is None:
+            seed = deal_seed() if seed is None else seed
+            cards = create_card_pairs(self.grid_size, seed)
+        self.seed = seed
+        self.cards = cards
         self.flipped_cards: List[int] = []
         self.matched_pairs: List[int] = []
         self.moves = 0
         self.score = 0
         self.time = 0
+        self.efficiency = 0.0
         self.is_processing = False
-        self.particle_effect.clear_particles()  # Clear any existing particles
+        self.active_time = 0.0
+        self.turns = TurnEngine(self.players) if self.players > 1 else None
+        if self.particle_effect:
+            self.particle_effect.clear_particles()  # Clear any existing particles
+        if self.turns:
+            for player in range(self.players):
+                self.ui_callback.update_score(0, player)
+                self.ui_callback.update_moves(0, player)
+            self.ui_callback.update_turn(self.turns.current)
+        else:
+            self.ui_callback.update_score(self.score)
+            self.ui_callback.update_moves(self.moves)
+        self.ui_callback.reset_cards()
+        if self.saver:
+            self.saver.clear()  # nothing worth resuming yet
+        self.paused = True
+        self.resume()
+
+    def restore(self, snapshot) -> None:
+        """Put a just-reset game back to a saved point; the deal must be the snapshot's."""
+        self.matched_pairs = list(snapshot.matched)
+        self.moves = snapshot.moves
+        self.score = len(self.matched_pairs) // 2 * 10
+        self.active_time = snapshot.elapsed_ms / 1000
+        if not self.paused:
+            self.started_at = time.monotonic()
+        self.time = round(self.elapsed())
+        for index in self.matched_pairs:
+            self.ui_callback.flip_card(index, self.cards[index], True)
         self.ui_callback.update_score(self.score)
         self.ui_callback.update_moves(self.moves)
-        self.ui_callback.reset_cards()
-        self.timer.start(1000)  # Update every second
+        self.save_progress()
+
+    def save_progress(self) -> None:
+        """Hand a snapshot to the saver; finished and multiplayer games aren't kept."""
+        if not self.saver:
+            return
+        snapshot = GameSnapshot.of(self)
+        if snapshot:
+            self.saver.save(snapshot)
+        else:
+            self.saver.clear()
 
+    @traced('MemoryGame.handle_card_click')
     def handle_card_click(self, index: int) -> None:
         """Handle a card click event."""
-        if self.is_processing or index in self.flipped_cards or index in self.matched_pairs:
+        if index in self.matched_pairs:
             return
-
-        # Start timer on first card click
-        if not self.flipped_cards:
-            self.timer.start(1000)
+        if index in self.flipped_cards:
+            # Reopening a card of the mismatch on show is a click-ahead like
+            # any other; only the second click of a double-click is dropped
+            repeat = (index == self.flipped_cards[-1]
+                      and time.monotonic() - self.last_click_at < MIN_FLIP_BACK / 1000)
+            if not self.is_processing or repeat:
+                return
+        self.last_click_at = time.monotonic()
+        if self.is_processing:
+            # Click-ahead: settle the mismatch on show now, then take the click
+            self.ui_callback.cancel_card_flip_back()
+            self.flip_cards_back()
 
         # Flip the clicked card
         self.flipped_cards.append(index)
         self.ui_callback.flip_card(index, self.cards[index], True)
 
+        if len(self.flipped_cards) == 1:
+            self.first_click_at = time.monotonic()
+
         # If this is the second card
         if len(self.flipped_cards) == 2:
-            self.moves += 1
-            self.ui_callback.update_moves(self.moves)
             self.is_processing = True
+            self.update_pace(time.monotonic() - self.first_click_at)
 
             # Check for a match
-            if self.cards[self.flipped_cards[0]] == self.cards[self.flipped_cards[1]]:
+            matched = self.cards[self.flipped_cards[0]] == self.cards[self.flipped_cards[1]]
+            self.record_move(matched)
+
+            if matched:
                 self.matched_pairs.extend(self.flipped_cards)
-                self.score += 10
-                self.ui_callback.update_score(self.score)
                 
                 # Emit particles for matched cards
-                for card_index in self.flipped_cards:
-                    pos = self.ui_callback.get_card_position(card_index)
-                    card = self.ui_callback.cards[card_index]
-                    # Use the card's center position
-                    center_x = pos.x() + card.width() // 2
-                    center_y = pos.y() + card.height() // 2
-                    # Force immediate particle effect
-                    self.particle_effect.clear_particles()  # Clear any existing particles
-                    self.particle_effect.emit(center_x, center_y, "#4CAF50", 50)
-                    self.particle_effect.update()  # Force immediate update
+                self.emit_match_particles(self.flipped_cards)
                 
                 self.flipped_cards = []
                 self.is_processing = False
 
                 # Check for game completion
-                if len(self.matched_pairs) == len(self.cards):
-                    self.timer.stop()
+                if self.is_complete():
+                    if self.timer:
+                        self.timer.stop()
+                    self.time = int(self.elapsed())
+                    # Compare against the expected moves of a perfect-memory player
+                    self.efficiency = efficiency(self.moves, self.cards)
                     # Emit celebration particles
-                    for _ in range(8):
-                        x = random.randint(0, self.ui_callback.game_widget.width())
-                        y = random.randint(0, self.ui_callback.game_widget.height())
-                        self.particle_effect.emit(x, y, "#FFD700", 60)
+                    self.emit_celebration_particles()
                     self.ui_callback.show_game_complete()
             else:
                 # Schedule card flip back
                 self.ui_callback.schedule_card_flip_back(self.flipped_cards)
+            self.save_progress()
+
+    def update_pace(self, seconds: float) -> None:
+        """Fold one pair's click interval into the flip-back delay."""
+        seconds = min(seconds, ANIMATION_DURATION / 1000)
+        if self.pair_pace is None:
+            self.pair_pace = seconds
+        else:
+            self.pair_pace = 0.7 * self.pair_pace + 0.3 * seconds
+        # Leave a mismatch up for about twice the player's own reaction time
+        delay = int(self.pair_pace * 2000)
+        self.flip_back_delay = max(MIN_FLIP_BACK, min(ANIMATION_DURATION, delay))
+
+    def record_move(self, matched: bool) -> None:
+        """Update the counters of whoever made the move and pass the turn on a miss."""
+        self.moves += 1
+        if matched:
+            self.score += 10
+        if not self.turns:
+            self.ui_callback.update_moves(self.moves)
+            if matched:
+                self.ui_callback.update_score(self.score)
+            return
+        player = self.turns.current
+        passed = self.turns.record(matched)
+        self.ui_callback.update_moves(self.turns.moves[player], player)
+        if matched:
+            self.ui_callback.update_score(self.turns.scores[player], player)
+        if passed:
+            self.ui_callback.update_turn(self.turns.current)
+
+    def emit_match_particles(self, card_indices: List[int]) -> None:
+        """Burst particles from the centre of each matched card."""
+        if not self.particle_effect:
+            return
+        for card_index in card_indices:
+            pos = self.ui_callback.get_card_position(card_index)
+            card = self.ui_callback.cards[card_index]
+            # Use the card's center position
+            center_x = pos.x() + card.width() // 2
+            center_y = pos.y() + card.height() // 2
+            # Force immediate particle effect
+            self.particle_effect.clear_particles()  # Clear any existing particles
+            self.particle_effect.emit(center_x, center_y, "#4CAF50", 50)
+            self.particle_effect.update()  # Force immediate update
 
+    def emit_celebration_particles(self) -> None:
+        """Scatter celebration particles across the game screen."""
+        if not self.particle_effect:
+            return
+        for _ in range(8):
+            x = random.randint(0, self.ui_callback.game_widget.width())
+            y = random.randint(0, self.ui_callback.game_widget.height())
+            self.particle_effect.emit(x, y, "#FFD700", 60)
+
+    @traced('MemoryGame.flip_cards_back')
     def flip_cards_back(self) -> None:
         """Flip unmatched cards back."""
         for index in self.flipped_cards:
@@ -92,14 +240,48 @@ class MemoryGame:
         self.flipped_cards = []
         self.is_processing = False
 
+    def elapsed(self) -> float:
+        """Seconds played, not counting time spent paused."""
+        if self.paused:
+            return self.active_time
+        return self.active_time + time.monotonic() - self.started_at
+
+    def pause(self) -> None:
+        """Stop the clock, the timer and the particles."""
+        if self.paused:
+            return
+        self.active_time = self.elapsed()
+        self.paused = True
+        if self.timer:
+            self.timer.stop()
+        if self.particle_effect:
+            self.particle_effect.suspend()
+        self.save_progress()  # the clock only moves while playing
+
+    def resume(self) -> None:
+        """Restart whatever pause() stopped."""
+        if not self.paused:
+            return
+        self.paused = False
+        self.started_at = time.monotonic()
+        if self.timer and not self.is_complete():
+            self.timer.start(1000)  # Update every second
+        if self.particle_effect:
+            self.particle_effect.resume()
+
     def update_time(self) -> None:
         """Update the game timer."""
-        self.time += 1
+        # Coarse timers may fire a little early, so round rather than truncate
+        self.time = round(self.elapsed())
 
     def get_card_symbol(self, index: int) -> str:
         """Get the symbol for a card at the given index."""
         return self.cards[index]
 
+    def is_complete(self) -> bool:
+        """Check if every card has been matched."""
+        return len(self.matched_pairs) == len(self.cards)
+
     def is_card_matched(self, index: int) -> bool:
         """Check if a card is part of a matched pair."""
         return index in self.matched_pairs 
\ No newline at end of file
@@ -0,0 +1,116 @@
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton
+from PyQt5.QtCore import Qt, QEvent, pyqtSignal
+
+class GameCompleteOverlay(QWidget):
+    """Inline end-of-game panel drawn over the game screen.
+
+    Unlike a modal dialog it never starts a nested event loop, so the
+    celebration particles keep animating while the player types a name.
+    """
+    submitted = pyqtSignal(str)  # Name entered for the scoreboard
+    play_again = pyqtSignal()
+    back_to_menu = pyqtSignal()
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground)
+        self.setStyleSheet("""
+            GameCompleteOverlay {
+                background-color: rgba(0, 0, 0, 120);
+            }
+            QWidget#overlay_panel {
+                border-radius: 8px;
+                padding: 20px;
+            }
+            QLineEdit {
+                padding: 6px;
+                font-size: 16px;
+            }
+        """)
+        self.setup_ui()
+        # Track the game screen's size so the overlay always covers it
+        parent.installEventFilter(self)
+        self.setGeometry(parent.rect())
+        self.hide()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setAlignment(Qt.AlignCenter)
+
+        self.panel = QWidget()
+        self.panel.setObjectName("overlay_panel")
+        self.panel.setFixedWidth(420)
+        panel_layout = QVBoxLayout(self.panel)
+        panel_layout.setSpacing(12)
+
+        self.title_label = QLabel("Game Complete!")
+        self.title_label.setProperty("class", "heading")
+        self.title_label.setAlignment(Qt.AlignCenter)
+        panel_layout.addWidget(self.title_label)
+
+        self.result_label = QLabel()
+        self.result_label.setAlignment(Qt.AlignCenter)
+        self.result_label.setWordWrap(True)
+        panel_layout.addWidget(self.result_label)
+
+        # Name entry for the scoreboard
+        self.name_row = QWidget()
+        name_layout = QHBoxLayout(self.name_row)
+        name_layout.setContentsMargins(0, 0, 0, 0)
+        self.name_input = QLineEdit("Player")
+        self.name_input.setMaxLength(32)
+        self.name_input.returnPressed.connect(self.on_submit)
+        name_layout.addWidget(self.name_input)
+        self.save_btn = QPushButton("Save Score")
+        self.save_btn.clicked.connect(self.on_submit)
+        name_layout.addWidget(self.save_btn)
+        panel_layout.addWidget(self.name_row)
+
+        self.status_label = QLabel()
+        self.status_label.setProperty("class", "small")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        panel_layout.addWidget(self.status_label)
+
+        buttons = QHBoxLayout()
+        play_again_btn = QPushButton("Play Again")
+        play_again_btn.clicked.connect(self.play_again.emit)
+        buttons.addWidget(play_again_btn)
+        menu_btn = QPushButton("Back to Menu")
+        menu_btn.clicked.connect(self.back_to_menu.emit)
+        buttons.addWidget(menu_btn)
+        panel_layout.addLayout(buttons)
+
+        layout.addWidget(self.panel)
+
+    def eventFilter(self, obj, event):
+        if obj is self.parent() and event.type() == QEvent.Resize:
+            self.setGeometry(obj.rect())
+        return False
+
+    def show_result(self, title: str, text: str, ask_name: bool = True):
+        """Show the panel; ask_name adds the scoreboard name entry."""
+        self.title_label.setText(title)
+        self.result_label.setText(text)
+        self.status_label.setText("")
+        self.name_row.setVisible(ask_name)
+        self.name_input.setEnabled(True)
+        self.save_btn.setEnabled(True)
+        self.setGeometry(self.parent().rect())
+        self.show()
+        self.raise_()
+        if ask_name:
+            self.name_input.setFocus()
+            self.name_input.selectAll()
+
+    def on_submit(self):
+        name = self.name_input.text().strip()
+        if not name or not self.save_btn.isEnabled():
+            return
+        # One submission per game
+        self.name_input.setEnabled(False)
+        self.save_btn.setEnabled(False)
+        self.status_label.setText("Saving...")
+        self.submitted.emit(name)
+
+    def show_status(self, text: str):
+        self.status_label.setText(text)
@@ -0,0 +1,17 @@
+import heapq
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+def score_key(entry: Dict) -> Tuple[int, int]:
+    """Ranking order of the scoreboard: fewest moves, then fastest time."""
+    return (entry['moves'], entry['time'])
+
+
+def merge_scores(streams: Iterable[Iterable[Dict]], limit: Optional[int] = None) -> Iterator[Dict]:
+    """Lazily k-way merge score streams that are each already ranked.
+
+    Only one pending entry per stream is held at a time, so merging many
+    shards costs memory proportional to the number of streams, not entries.
+    """
+    return islice(heapq.merge(*streams, key=score_key), limit)
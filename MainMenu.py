@@ -54,6 +54,12 @@ class MainMenu(QWidget):
         start_btn.clicked.connect(self.start_game)
         layout.addWidget(start_btn, alignment=Qt.AlignCenter)
 
+        # Two Players button
+        two_players_btn = QPushButton("Two Players")
+        two_players_btn.setFixedSize(button_width, button_height)
+        two_players_btn.clicked.connect(self.start_two_player_game)
+        layout.addWidget(two_players_btn, alignment=Qt.AlignCenter)
+
         # Settings button
         settings_btn = QPushButton("Settings")
         settings_btn.setFixedSize(button_width, button_height)
@@ -82,14 +88,18 @@ class MainMenu(QWidget):
         layout.addStretch() # Push buttons to center, and leave space at bottom
 
     def start_game(self):
-        self.parent.reset_game()
+        self.parent.reset_game(players=1)
+        self.parent.stacked_widget.setCurrentWidget(self.parent.game_screen)
+
+    def start_two_player_game(self):
+        self.parent.reset_game(players=2)
         self.parent.stacked_widget.setCurrentWidget(self.parent.game_screen)
 
     def show_settings(self):
         self.parent.stacked_widget.setCurrentWidget(self.parent.settings_screen)
 
     def show_scoreboard(self):
-        self.parent.stacked_widget.setCurrentWidget(self.parent.scoreboard_screen)
+        self.parent.show_scoreboard()
 
     def quit_game(self):
         sys.exit() 
\ No newline at end of file
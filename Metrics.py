@@ -0,0 +1,41 @@
+import threading
+from typing import Dict
+
+# Process-wide counters and value summaries. Updates may come from any
+# thread, so every access goes through one lock.
+_lock = threading.Lock()
+_counters: Dict[str, int] = {}
+_values: Dict[str, Dict[str, float]] = {}
+
+
+def increment(name: str, amount: int = 1) -> None:
+    """Add amount to a counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name: str, value: float) -> None:
+    """Fold a measurement into the count/total/max summary for name."""
+    with _lock:
+        summary = _values.get(name)
+        if summary is None:
+            _values[name] = {'count': 1, 'total': value, 'max': value}
+        else:
+            summary['count'] += 1
+            summary['total'] += value
+            summary['max'] = max(summary['max'], value)
+
+
+def snapshot() -> Dict[str, Dict]:
+    """Copy of all counters and summaries."""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'values': {name: dict(summary) for name, summary in _values.items()},
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _values.clear()
@@ -1,8 +1,10 @@
 from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint
 from PyQt5.QtGui import QPainter, QColor, QPen
 import random
 import math
+from Tracing import traced
+from Scheduler import Scheduler
 
 class Particle:
     def __init__(self, x, y, color):
@@ -47,6 +49,9 @@ class ParticleEffect(QWidget):
         self.fade_animation.setEndValue(0.0)
         self.fade_animation.setEasingCurve(QEasingCurve.OutCubic)
         self.fade_animation.finished.connect(self.hide)
+        self.scheduler = Scheduler(self)
+        self.suspended = False
+        self.fade_due = False  # a fade was pending when suspended
 
     @pyqtProperty(float)
     def opacity(self):
@@ -65,19 +70,45 @@ class ParticleEffect(QWidget):
         self.raise_()
         self.update()  # Force immediate update
         
-        # Start fade out after a delay
-        QTimer.singleShot(2000, self.start_fade_out)
+        # Start fade out 2 seconds after the latest burst
+        self.scheduler.cancel_all()
+        self.scheduler.call_later(2000, self.start_fade_out)
 
     def clear_particles(self):
-        """Clear all particles."""
+        """Clear all particles and any pending fade."""
         self.particles = []
+        self.scheduler.cancel_all()
+        self.fade_due = False
+        self.fade_animation.stop()
+        self.update()
+
+    def suspend(self):
+        """Stop stepping particles and hold the fade until resume()."""
+        if self.suspended:
+            return
+        self.suspended = True
+        self.fade_due = self.scheduler.live > 0
+        self.scheduler.cancel_all()
+        if self.fade_animation.state() == QPropertyAnimation.Running:
+            self.fade_animation.pause()
+
+    def resume(self):
+        if not self.suspended:
+            return
+        self.suspended = False
+        if self.fade_due:
+            self.fade_due = False
+            self.scheduler.call_later(2000, self.start_fade_out)
+        if self.fade_animation.state() == QPropertyAnimation.Paused:
+            self.fade_animation.resume()
         self.update()
 
     def start_fade_out(self):
         self.fade_animation.start()
 
+    @traced('ParticleEffect.paintEvent')
     def paintEvent(self, event):
-        if not self.particles:
+        if not self.particles or self.suspended:
             return
 
         painter = QPainter(self)
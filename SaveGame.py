@@ -0,0 +1,175 @@
+import atexit
+import math
+import os
+import struct
+import threading
+import zlib
+from typing import IO, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; every instance there uses the first slot
+    fcntl = None
+
+# A saved game is the deal's seed plus what the player has done with it, not
+# the cards themselves: the deal is recreated from the seed on resume.
+#
+#   header  magic, format version, grid size, seed, moves, elapsed ms
+#   mask    one bit per card, set once the card is matched
+#   crc32   of everything before it, so a torn write reads as no save
+#
+# A 10x10 game is 35 bytes.
+#
+# Instances sharing a settings file each claim a save slot with a lock held
+# for as long as they run, so they never resume each other's games. A lone
+# instance always gets the first slot back on its next launch.
+
+MAGIC = b'MGSV'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBBIII')
+CHECKSUM = struct.Struct('<I')
+MAX_SLOTS = 64
+
+
+def save_path(settings_file: str, slot: int = 0) -> str:
+    """The in-progress game of one instance, kept next to a settings file."""
+    base = os.path.splitext(settings_file)[0]
+    return f'{base}.save' if slot == 0 else f'{base}.{slot}.save'
+
+
+class GameSnapshot:
+    """Everything needed to put a single-player game back where it was."""
+    __slots__ = ('grid_size', 'seed', 'moves', 'elapsed_ms', 'matched')
+
+    def __init__(self, grid_size: int, seed: int, moves: int, elapsed_ms: int, matched: List[int]):
+        self.grid_size = grid_size
+        self.seed = seed
+        self.moves = moves
+        self.elapsed_ms = elapsed_ms
+        self.matched = matched
+
+    @classmethod
+    def of(cls, game) -> Optional['GameSnapshot']:
+        """Snapshot a MemoryGame, or None if it can't be resumed from one."""
+        if (game.seed is None or not 0 <= game.seed < 2 ** 32 or game.turns
+                or game.moves == 0 or game.is_complete()):
+            return None
+        grid_size = math.isqrt(len(game.cards))
+        return cls(grid_size, game.seed, game.moves, int(game.elapsed() * 1000), list(game.matched_pairs))
+
+    def encode(self) -> bytes:
+        mask = 0
+        for index in self.matched:
+            mask |= 1 << index
+        cards = self.grid_size * self.grid_size
+        data = HEADER.pack(MAGIC, FORMAT_VERSION, self.grid_size, self.seed, self.moves,
+                           self.elapsed_ms) + mask.to_bytes((cards + 7) // 8, 'little')
+        return data + CHECKSUM.pack(zlib.crc32(data))
+
+    @classmethod
+    def decode(cls, data: bytes) -> Optional['GameSnapshot']:
+        """Parse a saved game; None if it is torn, corrupt or from another format."""
+        if len(data) < HEADER.size + CHECKSUM.size:
+            return None
+        body, (crc,) = data[:-CHECKSUM.size], CHECKSUM.unpack(data[-CHECKSUM.size:])
+        if zlib.crc32(body) != crc:
+            return None
+        magic, version, grid_size, seed, moves, elapsed_ms = HEADER.unpack_from(body)
+        cards = grid_size * grid_size
+        if magic != MAGIC or version != FORMAT_VERSION or len(body) != HEADER.size + (cards + 7) // 8:
+            return None
+        mask = int.from_bytes(body[HEADER.size:], 'little')
+        matched = [index for index in range(cards) if mask >> index & 1]
+        return cls(grid_size, seed, moves, elapsed_ms, matched)
+
+
+class GameSaver:
+    """Writes the latest snapshot of a game on a background thread.
+
+    save() and clear() only swap the pending bytes and return, so the game
+    can save after every move; the thread always writes the newest one and
+    skips any it was too slow for. Files are replaced atomically.
+    """
+    CLEAR = b''
+
+    def __init__(self, path: str, slot_lock: Optional[IO] = None):
+        self.path = path
+        self.slot_lock = slot_lock  # held open to keep the slot
+        self.pending: Optional[bytes] = None
+        self.busy = False
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    @classmethod
+    def claim(cls, settings_file: str) -> 'GameSaver':
+        """A saver for the first save slot no other running instance holds."""
+        if fcntl is None:
+            return cls(save_path(settings_file))
+        for slot in range(MAX_SLOTS):
+            path = save_path(settings_file, slot)
+            try:
+                handle = open(path + '.lock', 'a')
+            except OSError:
+                break
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                continue
+            return cls(path, handle)
+        return cls(save_path(settings_file))  # nothing claimable: share the first slot
+
+    def load(self) -> Optional[GameSnapshot]:
+        try:
+            with open(self.path, 'rb') as f:
+                return GameSnapshot.decode(f.read())
+        except OSError:
+            return None
+
+    def save(self, snapshot: GameSnapshot) -> None:
+        self.submit(snapshot.encode())
+
+    def clear(self) -> None:
+        """Forget the saved game, e.g. once it is finished or abandoned."""
+        self.submit(self.CLEAR)
+
+    def submit(self, data: bytes) -> None:
+        with self.condition:
+            self.pending = data
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='game-saver', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until the latest save is on disk."""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending is None and not self.busy, timeout)
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                data, self.pending = self.pending, None
+                self.busy = True
+            self.write(data)
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    def write(self, data: bytes) -> None:
+        try:
+            if data == self.CLEAR:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            temp = self.path + '.tmp'
+            with open(temp, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, self.path)
+        except OSError:
+            pass  # a missed autosave only costs the moves since the last one
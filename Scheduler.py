@@ -0,0 +1,74 @@
+from typing import Callable, Dict
+from PyQt5.QtCore import QObject
+
+_live = 0  # pending tasks across every scheduler
+
+
+def live_count() -> int:
+    """Tasks still pending in any scheduler; a count that keeps growing is a leak."""
+    return _live
+
+
+class Task:
+    """Handle for one scheduled callback."""
+    __slots__ = ('scheduler', 'timer_id', 'callback')
+
+    def __init__(self, scheduler: 'Scheduler', timer_id: int, callback: Callable[[], None]):
+        self.scheduler = scheduler
+        self.timer_id = timer_id
+        self.callback = callback
+
+    @property
+    def pending(self) -> bool:
+        # Timer ids are reused once freed, so check it is still this task
+        return self.scheduler.tasks.get(self.timer_id) is self
+
+    def cancel(self) -> None:
+        """Drop the callback if it has not run yet."""
+        if self.pending:
+            self.scheduler.discard(self.timer_id)
+
+
+class Scheduler(QObject):
+    """Delayed callbacks owned by one screen, widget or game.
+
+    A drop-in for QTimer.singleShot whose calls can be taken back: call_later
+    returns a Task to cancel, and cancel_all drops everything still pending
+    when the owner resets or goes off screen. Timers run on this object's
+    own timer ids, so no QTimer is created per call.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tasks: Dict[int, Task] = {}
+
+    @property
+    def live(self) -> int:
+        return len(self.tasks)
+
+    def call_later(self, delay: int, callback: Callable[[], None]) -> Task:
+        """Run callback once after delay milliseconds."""
+        global _live
+        timer_id = self.startTimer(max(0, delay))
+        task = Task(self, timer_id, callback)
+        self.tasks[timer_id] = task
+        _live += 1
+        return task
+
+    def discard(self, timer_id: int) -> None:
+        global _live
+        if self.tasks.pop(timer_id, None) is not None:
+            self.killTimer(timer_id)
+            _live -= 1
+
+    def cancel_all(self) -> None:
+        """Cancel every pending task."""
+        for timer_id in list(self.tasks):
+            self.discard(timer_id)
+
+    def timerEvent(self, event):
+        task = self.tasks.get(event.timerId())
+        if task is None:
+            return
+        self.discard(task.timer_id)
+        task.callback()
@@ -11,6 +11,7 @@ class ScoreboardScreen(QWidget):
         super().__init__(parent)
         self.parent = parent
         self.settings = Settings()
+        self.leaderboard = getattr(parent, 'leaderboard', None)
         self.setup_ui()
 
     def setup_ui(self):
@@ -52,7 +53,11 @@ class ScoreboardScreen(QWidget):
         self.load_scores()
 
     def load_scores(self):
-        scores = self.settings.get_scores()
+        if self.leaderboard:
+            # Read straight from shared memory: no file access, no parsing
+            scores = self.leaderboard.top(self.settings.get_setting('grid_size', 4))
+        else:
+            scores = self.settings.get_scores()
         self.table.setRowCount(len(scores))
         
         for i, score in enumerate(scores):
@@ -76,6 +81,11 @@ class ScoreboardScreen(QWidget):
             time_item.setTextAlignment(Qt.AlignCenter)
             self.table.setItem(i, 3, time_item)
 
+    def on_settings_file_changed(self):
+        """Reload if showing; show_scoreboard reloads before it is shown anyway."""
+        if self.isVisible():
+            self.load_scores()
+
     def update_scores(self, player_name: str, moves: int, time: int):
         self.settings.add_score(player_name, moves, time)
         self.load_scores()
@@ -89,6 +99,8 @@ class ScoreboardScreen(QWidget):
     def on_clear_scores(self):
         """Clear all scores and update the table."""
         self.settings.clear_scores()
+        if self.leaderboard:
+            self.leaderboard.clear()
         self.load_scores()
 
     def on_back(self):
@@ -0,0 +1,306 @@
+import argparse
+import csv
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from Leaderboard import merge_scores, score_key
+from Settings import history_path, locked, read_current
+
+# Every command streams the history file line by line, so memory stays
+# constant however many games it holds. Only `compact` needs more than one
+# pass: it sorts fixed-size runs to temporary files and merges them.
+
+CSV_FIELDS = ('timestamp', 'name', 'grid_size', 'moves', 'time')
+COMPACT_CHUNK = 100000  # entries sorted in memory per run
+MERGE_BATCH = 256  # kiosk files loaded concurrently per merge run
+MERGE_WORKERS = 16
+
+
+def read_history(path: str) -> Iterator[Dict]:
+    """Scores from a JSON-lines history, skipping blank or torn lines."""
+    try:
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue  # e.g. the last line of a crashed write
+
+
+def read_csv(path: str) -> Iterator[Dict]:
+    """Scores from a CSV export."""
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            yield normalize(row)
+
+
+def read_settings(path: str) -> Iterator[Dict]:
+    """Scores from the top-N list of a settings.json, journal included."""
+    settings = read_current(path)
+    if settings is None:
+        raise ValueError(f'unreadable settings file: {path}')
+    return iter(settings.get('scores', []))
+
+
+def read_any(path: str) -> Iterator[Dict]:
+    """Scores from a .jsonl history, a .csv export or a settings .json file."""
+    if path.endswith('.csv'):
+        return read_csv(path)
+    if path.endswith('.json'):
+        return read_settings(path)
+    return read_history(path)
+
+
+def normalize(entry: Dict) -> Dict:
+    """Coerce CSV strings back to numbers; empty fields become None."""
+    def number(value, kind):
+        return kind(value) if value not in (None, '') else None
+    return {
+        'name': entry.get('name') or '',
+        'moves': number(entry.get('moves'), int),
+        'time': number(entry.get('time'), int),
+        'grid_size': number(entry.get('grid_size'), int),
+        'timestamp': number(entry.get('timestamp'), float),
+    }
+
+
+def has_score(entry: Dict) -> bool:
+    """True if the entry has the moves and time it is ranked by."""
+    return entry.get('moves') is not None and entry.get('time') is not None
+
+
+def record_key(entry: Dict) -> Tuple:
+    """Chronological order; identical games sort next to each other."""
+    return (entry.get('timestamp') or 0, entry.get('name') or '', entry.get('grid_size') or 0,
+            entry.get('moves'), entry.get('time'))
+
+
+def top(entries: Iterable[Dict], limit: int, grid_size: Optional[int] = None) -> List[Dict]:
+    """Best `limit` scores, keeping only `limit` entries in memory."""
+    if grid_size is not None:
+        entries = (e for e in entries if e.get('grid_size') == grid_size)
+    return heapq.nsmallest(limit, entries, key=score_key)
+
+
+def player_history(entries: Iterable[Dict], name: str, grid_size: Optional[int] = None) -> Iterator[Dict]:
+    """One player's games in the order they were recorded."""
+    for entry in entries:
+        if entry.get('name') == name and (grid_size is None or entry.get('grid_size') == grid_size):
+            yield entry
+
+
+def write_jsonl(entries: Iterable[Dict], out: IO) -> int:
+    count = 0
+    for entry in entries:
+        out.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        count += 1
+    return count
+
+
+def write_csv(entries: Iterable[Dict], out: IO) -> int:
+    writer = csv.DictWriter(out, CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for entry in entries:
+        writer.writerow(entry)
+        count += 1
+    return count
+
+
+def import_scores(history: str, paths: Iterable[str]) -> int:
+    """Append every score found in paths to the history.
+
+    Rows without moves or time can't be ranked and are skipped, and so is
+    the history itself, which would otherwise read its own appends forever.
+    """
+    paths = [p for p in paths if not is_same_file(p, history)]
+    entries = itertools.chain.from_iterable(read_any(p) for p in paths)
+    with locked(history, exclusive=True), open(history, 'a') as out:
+        return write_jsonl(filter(has_score, entries), out)
+
+
+def is_same_file(path: str, other: str) -> bool:
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return False  # e.g. no history yet
+
+
+def sorted_runs(entries: Iterable[Dict], chunk: int, scratch: str) -> List[str]:
+    """Split entries into sorted temporary files of at most `chunk` each."""
+    runs = []
+    it = iter(entries)
+    while True:
+        run = sorted(itertools.islice(it, chunk), key=record_key)
+        if not run:
+            return runs
+        path = os.path.join(scratch, f'run-{len(runs):05d}.jsonl')
+        with open(path, 'w') as f:
+            write_jsonl(run, f)
+        runs.append(path)
+
+
+def compact(history: str, chunk: int = COMPACT_CHUNK) -> Tuple[int, int]:
+    """Rewrite the history deduplicated and in chronological order.
+
+    An external merge sort: memory is bounded by `chunk` entries plus one per
+    run. The new file replaces the old one atomically. The history's lock is
+    held throughout, so games finished meanwhile wait to be appended to the
+    new file instead of being lost with the old one. Returns (kept, dropped).
+    """
+    directory = os.path.dirname(os.path.abspath(history))
+    with locked(history, exclusive=True), tempfile.TemporaryDirectory(dir=directory) as scratch:
+        runs = sorted_runs(read_history(history), chunk, scratch)
+        merged = heapq.merge(*(read_history(run) for run in runs), key=record_key)
+        target = os.path.join(scratch, 'compacted.jsonl')
+        total = kept = 0
+        previous = None
+        with open(target, 'w') as out:
+            for entry in merged:
+                total += 1
+                key = record_key(entry)
+                if key == previous:
+                    continue  # identical games sort next to each other
+                previous = key
+                out.write(json.dumps(entry, separators=(',', ':')) + '\n')
+                kept += 1
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(target, history)
+    return kept, total - kept
+
+
+def content_hash(entry: Dict) -> bytes:
+    """Identity of a recorded game, whichever kiosk file it came from."""
+    key = (entry.get('name'), entry.get('moves'), entry.get('time'), entry.get('timestamp'))
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+def dedupe(ranked: Iterable[Dict]) -> Iterator[Dict]:
+    """Drop repeated games from a stream ranked by score_key.
+
+    Copies of a game share its score_key and so arrive together; only the
+    hashes of the current (moves, time) group are remembered.
+    """
+    group = None
+    seen = set()
+    for entry in ranked:
+        key = score_key(entry)
+        if key != group:
+            group = key
+            seen.clear()
+        digest = content_hash(entry)
+        if digest not in seen:
+            seen.add(digest)
+            yield entry
+
+
+def load_kiosk(path: str) -> List[Dict]:
+    """The ranked scores of one kiosk's settings file; unreadable files count as empty."""
+    try:
+        scores = list(read_settings(path))
+    except (OSError, ValueError, AttributeError):
+        return []
+    return sorted(filter(has_score, scores), key=score_key)
+
+
+def kiosk_files(paths: Iterable[str]) -> Iterator[str]:
+    """The given files, plus every .json file under the given directories."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith('.json'):
+                    yield os.path.join(root, name)
+
+
+def merge_kiosks(paths: Iterable[str], out: IO, limit: Optional[int] = None,
+                 workers: int = MERGE_WORKERS, batch: int = MERGE_BATCH) -> int:
+    """Merge many kiosk settings files into one deduplicated ranking.
+
+    Files are loaded on a thread pool `batch` at a time; each batch is k-way
+    merged, deduped and cut to `limit` into a temporary run, and the runs
+    are merged the same way into out. Memory is bounded by one batch of
+    files plus one entry per run, however many files there are.
+    """
+    files = iter(paths)
+    with ThreadPoolExecutor(workers) as pool, tempfile.TemporaryDirectory() as scratch:
+        runs = []
+        while True:
+            chunk = list(itertools.islice(files, batch))
+            if not chunk:
+                break
+            ranked = itertools.islice(dedupe(merge_scores(pool.map(load_kiosk, chunk))), limit)
+            path = os.path.join(scratch, f'run-{len(runs):05d}.jsonl')
+            with open(path, 'w') as f:
+                write_jsonl(ranked, f)
+            runs.append(path)
+        merged = dedupe(merge_scores(read_history(run) for run in runs))
+        return write_jsonl(itertools.islice(merged, limit), out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query and maintain the score history')
+    parser.add_argument('--history', default=history_path('settings.json'),
+                        help='history file (default: next to settings.json)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    best = sub.add_parser('top', help='best scores')
+    best.add_argument('--grid', type=int, default=None)
+    best.add_argument('--limit', type=int, default=10)
+    player = sub.add_parser('player', help="one player's games")
+    player.add_argument('name')
+    player.add_argument('--grid', type=int, default=None)
+    export = sub.add_parser('export', help='stream the history out')
+    export.add_argument('--format', choices=('jsonl', 'csv'), default='jsonl')
+    export.add_argument('--output', default='-')
+    bulk = sub.add_parser('import', help='append scores from .jsonl, .csv or settings .json files')
+    bulk.add_argument('paths', nargs='+')
+    tidy = sub.add_parser('compact', help='dedupe and sort the history in place')
+    tidy.add_argument('--chunk', type=int, default=COMPACT_CHUNK)
+    kiosks = sub.add_parser('merge', help='merge kiosk settings files into one ranking')
+    kiosks.add_argument('paths', nargs='+', help='settings files or directories of them')
+    kiosks.add_argument('--top', type=int, default=None)
+    kiosks.add_argument('--workers', type=int, default=MERGE_WORKERS)
+    kiosks.add_argument('--batch', type=int, default=MERGE_BATCH)
+    kiosks.add_argument('--output', default='-')
+    args = parser.parse_args()
+
+    if args.command == 'top':
+        write_jsonl(top(read_history(args.history), args.limit, args.grid), sys.stdout)
+    elif args.command == 'player':
+        write_jsonl(player_history(read_history(args.history), args.name, args.grid), sys.stdout)
+    elif args.command == 'export':
+        write = write_csv if args.format == 'csv' else write_jsonl
+        if args.output == '-':
+            write(read_history(args.history), sys.stdout)
+        else:
+            with open(args.output, 'w', newline='') as out:
+                write(read_history(args.history), out)
+    elif args.command == 'import':
+        print(f'imported {import_scores(args.history, args.paths)} scores', file=sys.stderr)
+    elif args.command == 'compact':
+        kept, dropped = compact(args.history, args.chunk)
+        print(f'kept {kept} scores, dropped {dropped} duplicates', file=sys.stderr)
+    else:
+        files = kiosk_files(args.paths)
+        if args.output == '-':
+            merge_kiosks(files, sys.stdout, args.top, args.workers, args.batch)
+        else:
+            with open(args.output, 'w') as out:
+                merge_kiosks(files, out, args.top, args.workers, args.batch)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional, Set
+from Game import MemoryGame
+
+# Protocol
+#
+# Clients send one JSON object per line and get one JSON object per line
+# back, in order:
+#
+#   {"op": "create", "grid_size": 4, "seed": 7}  -> {"ok": true, "room": 1, "cards": 16, "seat": 0}
+#   {"op": "join", "room": 1}                    -> {"ok": true, "room": 1, "cards": 16, "seat": 1, ...}
+#   {"op": "click", "room": 1, "index": 3}       -> {"ok": true, "events": [...], ...}
+#   {"op": "leave", "room": 1}                   -> {"ok": true}
+#
+# Click results are also pushed to every other client in the room as
+# {"room": 1, "events": [...], ...}. All timing comes from the server clock.
+#
+# Creating a room with "players": 2 runs the shared TurnEngine: each client
+# that joins takes the next free seat (later ones watch with seat null),
+# only the seat whose turn it is may click, and updates carry per-seat
+# "scores", "player_moves" and the current "turn".
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+ROOM_IDLE_TIMEOUT = 600  # seconds
+
+
+class RoomUI:
+    """ui_callback that turns game notifications into protocol events."""
+    __slots__ = ('game', 'events')
+
+    def __init__(self):
+        self.game = None
+        self.events: List[list] = []
+
+    def update_score(self, score: int, player: Optional[int] = None) -> None:
+        pass
+
+    def update_moves(self, moves: int, player: Optional[int] = None) -> None:
+        pass
+
+    def update_turn(self, player: int) -> None:
+        self.events.append(['turn', player])
+
+    def reset_cards(self) -> None:
+        self.events.clear()
+
+    def flip_card(self, index: int, symbol: str, is_front: bool) -> None:
+        self.events.append(['flip', index, symbol] if is_front else ['hide', index])
+
+    def schedule_card_flip_back(self, card_indices) -> None:
+        # The server is authoritative, so mismatches resolve immediately and
+        # clients animate the flip-back themselves
+        self.game.flip_cards_back()
+
+    def cancel_card_flip_back(self) -> None:
+        pass
+
+    def show_game_complete(self) -> None:
+        self.events.append(['complete'])
+
+
+class Room:
+    """A single headless game and the clients watching it."""
+    __slots__ = ('room_id', 'game', 'ui', 'started', 'last_active', 'clients', 'seats')
+
+    def __init__(self, room_id: int, grid_size: int, seed: int, now: float, players: int = 1):
+        self.room_id = room_id
+        self.ui = RoomUI()
+        self.game = MemoryGame(self.ui, headless=True, grid_size=grid_size, seed=seed,
+                               players=players)
+        self.ui.game = self.game
+        self.started = now
+        self.last_active = now
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.seats: Dict[asyncio.StreamWriter, int] = {}
+
+    def add_client(self, writer: asyncio.StreamWriter) -> Optional[int]:
+        """Add a client, seating it if a seat is free."""
+        self.clients.add(writer)
+        if writer not in self.seats and len(self.seats) < self.game.players:
+            taken = set(self.seats.values())
+            self.seats[writer] = min(s for s in range(self.game.players) if s not in taken)
+        return self.seats.get(writer)
+
+    def remove_client(self, writer: asyncio.StreamWriter) -> None:
+        self.clients.discard(writer)
+        self.seats.pop(writer, None)
+
+    def scores(self) -> Dict:
+        """Totals for the update messages."""
+        totals = {'moves': self.game.moves, 'score': self.game.score}
+        turns = self.game.turns
+        if turns:
+            totals.update(scores=list(turns.scores), player_moves=list(turns.moves),
+                          turn=turns.current)
+        return totals
+
+    def state(self, now: float) -> Dict:
+        return dict(
+            self.scores(),
+            room=self.room_id,
+            cards=len(self.game.cards),
+            matched=self.game.matched_pairs,
+            complete=self.game.is_complete(),
+            elapsed_ms=int((now - self.started) * 1000),
+        )
+
+    def click(self, index: int, now: float) -> List[list]:
+        self.last_active = now
+        self.game.handle_card_click(index)
+        events = self.ui.events
+        self.ui.events = []
+        return events
+
+
+class GameServer:
+    """Host many rooms on a single asyncio event loop."""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.rooms: Dict[int, Room] = {}
+        self.room_ids = itertools.count(1)
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.sweeper: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.sweeper = asyncio.ensure_future(self.sweep_idle_rooms())
+
+    async def stop(self) -> None:
+        if self.sweeper:
+            self.sweeper.cancel()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def sweep_idle_rooms(self) -> None:
+        """Drop rooms nobody has touched for ROOM_IDLE_TIMEOUT seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(ROOM_IDLE_TIMEOUT / 10)
+            cutoff = loop.time() - ROOM_IDLE_TIMEOUT
+            for room_id in [r.room_id for r in self.rooms.values() if r.last_active < cutoff]:
+                del self.rooms[room_id]
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        joined: Set[int] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    reply = self.dispatch(message, writer, joined)
+                except (ValueError, KeyError, TypeError) as e:
+                    reply = {'ok': False, 'error': str(e)}
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for room_id in joined:
+                room = self.rooms.get(room_id)
+                if room:
+                    room.remove_client(writer)
+            writer.close()
+
+    def dispatch(self, message: Dict, writer: asyncio.StreamWriter, joined: Set[int]) -> Dict:
+        now = asyncio.get_running_loop().time()
+        op = message['op']
+        if op == 'create':
+            grid_size = int(message.get('grid_size', 4))
+            if grid_size < 2 or grid_size % 2:
+                raise ValueError('grid_size must be an even number of at least 2')
+            seed = message.get('seed')
+            if seed is None:
+                seed = random.getrandbits(32)
+            players = int(message.get('players', 1))
+            if players < 1:
+                raise ValueError('players must be at least 1')
+            room = Room(next(self.room_ids), grid_size, int(seed), now, players)
+            self.rooms[room.room_id] = room
+            seat = room.add_client(writer)
+            joined.add(room.room_id)
+            return {'ok': True, 'room': room.room_id, 'cards': len(room.game.cards), 'seat': seat}
+
+        room = self.rooms.get(message.get('room'))
+        if room is None:
+            raise KeyError('unknown room')
+        if op == 'join':
+            seat = room.add_client(writer)
+            joined.add(room.room_id)
+            return dict(room.state(now), ok=True, seat=seat)
+        if op == 'leave':
+            room.remove_client(writer)
+            joined.discard(room.room_id)
+            return {'ok': True}
+        if op == 'click':
+            index = int(message['index'])
+            if not 0 <= index < len(room.game.cards):
+                raise ValueError('card index out of range')
+            if room.game.turns and room.seats.get(writer) != room.game.turns.current:
+                raise ValueError('not your turn')
+            events = room.click(index, now)
+            update = dict(
+                room.scores(),
+                room=room.room_id,
+                events=events,
+                elapsed_ms=int((now - room.started) * 1000),
+            )
+            self.broadcast(room, update, writer)
+            return dict(update, ok=True)
+        raise ValueError(f'unknown op {op!r}')
+
+    def broadcast(self, room: Room, update: Dict, sender: asyncio.StreamWriter) -> None:
+        """Push an update to every client in the room except the sender."""
+        if len(room.clients) < 2:
+            return
+        data = json.dumps(update).encode() + b'\n'
+        for client in room.clients:
+            if client is not sender:
+                client.write(data)
+
+
+# Load generator
+
+async def play_room(host: str, port: int, grid_size: int, latencies: List[float]) -> None:
+    """Create a room and play it to completion with a perfect-memory client."""
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def request(message: Dict) -> Dict:
+        start = time.perf_counter()
+        writer.write(json.dumps(message).encode() + b'\n')
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        if message['op'] == 'click':
+            latencies.append(time.perf_counter() - start)
+        return reply
+
+    created = await request({'op': 'create', 'grid_size': grid_size})
+    room_id = created['room']
+    unknown = list(range(created['cards']))
+    random.shuffle(unknown)
+    known: Dict[str, int] = {}
+    complete = False
+    while not complete:
+        first = unknown.pop()
+        reply = await request({'op': 'click', 'room': room_id, 'index': first})
+        symbol = reply['events'][0][2]
+        if symbol in known:
+            pair = known.pop(symbol)
+        else:
+            pair = unknown.pop()
+        reply = await request({'op': 'click', 'room': room_id, 'index': pair})
+        complete = ['complete'] in reply['events']
+        second_symbol = reply['events'][0][2]
+        if second_symbol != symbol:
+            known[symbol] = first
+            if second_symbol in known:
+                # Match the pair we just completed on the next move
+                other = known.pop(second_symbol)
+                await request({'op': 'click', 'room': room_id, 'index': other})
+                reply = await request({'op': 'click', 'room': room_id, 'index': pair})
+                complete = ['complete'] in reply['events']
+            else:
+                known[second_symbol] = pair
+    writer.close()
+
+
+async def run_load(host: str, port: int, rooms: int, concurrency: int, grid_size: int) -> Dict[str, float]:
+    """Play `rooms` games with `concurrency` clients and report throughput."""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker() -> None:
+        async with semaphore:
+            await play_room(host, port, grid_size, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(rooms)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        'rooms': rooms,
+        'seconds': elapsed,
+        'rooms_per_sec': rooms / elapsed,
+        'clicks': len(latencies),
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+    }
+
+
+async def run_load_local(rooms: int, concurrency: int, grid_size: int) -> Dict[str, float]:
+    """Start a server on an ephemeral port and load it from the same loop."""
+    server = GameServer(port=0)
+    await server.start()
+    try:
+        return await run_load(server.host, server.port, rooms, concurrency, grid_size)
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory game room server')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='run the server')
+    serve.add_argument('--host', default=DEFAULT_HOST)
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    load = sub.add_parser('load', help='run the load generator')
+    load.add_argument('--host', default=DEFAULT_HOST)
+    load.add_argument('--port', type=int, default=None,
+                      help='server to load; starts one in-process when omitted')
+    load.add_argument('--rooms', type=int, default=1000)
+    load.add_argument('--concurrency', type=int, default=200)
+    load.add_argument('--grid-size', type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        asyncio.run(GameServer(args.host, args.port).serve_forever())
+    elif args.port is None:
+        print(json.dumps(asyncio.run(run_load_local(args.rooms, args.concurrency, args.grid_size)), indent=4))
+    else:
+        print(json.dumps(asyncio.run(run_load(args.host, args.port, args.rooms,
+                                              args.concurrency, args.grid_size)), indent=4))
+
+if __name__ == '__main__':
+    main()
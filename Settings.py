@@ -1,56 +1,501 @@
+import atexit
+import contextlib
+import copy
 import json
 import os
-from typing import Dict, Any
+import threading
+import time
+import zlib
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from Leaderboard import score_key
+from Tracing import traced
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; writes there are atomic but unlocked
+    fcntl = None
+
+JOURNAL_CHECKPOINT = 64 * 1024  # journal bytes before it is folded into the file
+LSN_KEY = 'journal_lsn'  # sequence number of the last journal record in the file
+
+
+class PendingWrite:
+    """What one process wants changed in a settings file.
+
+    snapshot is the full state this process now sees, served back to its
+    own reads. The file itself is only changed by the recorded operations:
+    keys to overwrite, and scores to add to the top `limit`, so writes from
+    other processes in between are kept rather than clobbered. history holds
+    scores to append to the file's score history.
+    """
+    __slots__ = ('snapshot', 'updates', 'added', 'limit', 'history')
+
+    def __init__(self, snapshot: Dict[str, Any], updates: Dict[str, Any],
+                 added: List[Dict[str, Any]], limit: Optional[int],
+                 history: Optional[List[Dict[str, Any]]] = None):
+        self.snapshot = snapshot
+        self.updates = updates
+        self.added = added
+        self.limit = limit
+        self.history = history or []
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'PendingWrite':
+        return cls({}, record.get('updates', {}), record.get('added', []), record.get('limit'))
+
+    def record(self, lsn: int) -> Dict[str, Any]:
+        """The operations of this write, as stored in the journal under sequence number lsn."""
+        # The file's sequence number is only ever set by replay()
+        updates = {key: value for key, value in self.updates.items() if key != LSN_KEY}
+        return {'lsn': lsn, 'updates': updates, 'added': self.added, 'limit': self.limit}
+
+    def merge(self, newer: 'PendingWrite') -> None:
+        """Fold a newer write for the same file into this one."""
+        self.snapshot = newer.snapshot
+        if 'scores' in newer.updates:
+            self.added = []  # the newer write replaces the whole list
+        self.updates.update(newer.updates)
+        if newer.added:
+            # A write that adds no scores has no say in how many are kept
+            self.added.extend(newer.added)
+            self.limit = newer.limit
+        self.history.extend(newer.history)
+
+    def apply(self, current: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The file contents after this write, given what is on disk now."""
+        if current is None:
+            # Nothing usable on disk: this process's view is all there is
+            return copy.deepcopy(self.snapshot)
+        settings = current
+        settings.update(self.updates)
+        if self.added:
+            scores = settings.get('scores', [])
+            scores.extend(self.added)
+            scores.sort(key=score_key)
+            settings['scores'] = scores[:self.limit]
+        return settings
+
+
+class SettingsWriter:
+    """Write settings changes to disk on a single background thread.
+
+    The queue holds at most one write per file: submitting while a write is
+    still queued folds into it, so a burst of changes costs one write.
+    Callers never wait on the disk unless they flush().
+
+    Writes are made durable by appending a checksummed record of their
+    operations to <file>.journal rather than by rewriting the file. Once the
+    journal passes JOURNAL_CHECKPOINT bytes it is checkpointed: the records
+    are applied to the file, a synced temporary file is renamed over it and
+    the journal is emptied. Both happen under an exclusive lock on
+    <file>.lock, and readers take a shared lock, so instances sharing a
+    settings file never lose each other's scores or see a half-applied state.
+
+    Records carry increasing sequence numbers and a checkpointed file stores
+    the last one it includes, so a crash between the rename and emptying the
+    journal doesn't apply those records twice.
+    """
 
-class Settings:
     def __init__(self):
-        self.settings_file = 'settings.json'
+        self.pending: Dict[str, PendingWrite] = {}
+        self.in_flight: Dict[str, PendingWrite] = {}
+        self.condition = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+    def submit(self, path: str, write: PendingWrite) -> None:
+        """Queue a write for path, folding it into any queued older one."""
+        with self.condition:
+            queued = self.pending.get(path)
+            if queued is None:
+                self.pending[path] = write
+            else:
+                queued.merge(write)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='settings-writer', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def latest(self, path: str) -> Optional[Dict[str, Any]]:
+        """The newest snapshot for path that is not on disk yet, if any."""
+        with self.condition:
+            write = self.pending.get(path, self.in_flight.get(path))
+            return write.snapshot if write else None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is on disk."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.in_flight, timeout)
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                path = next(iter(self.pending))
+                write = self.pending.pop(path)
+                self.in_flight[path] = write
+            self.write(path, write)
+            with self.condition:
+                del self.in_flight[path]
+                self.condition.notify_all()
+
+    @traced('SettingsWriter.write')
+    def write(self, path: str, write: PendingWrite) -> None:
+        """Journal a write under the lock, checkpointing when the journal is full."""
+        if write.history:
+            append_history(history_path(path), write.history)
+        if not write.updates and not write.added and os.path.exists(path):
+            return  # nothing to journal, e.g. only history
+        settings = None  # the file's new contents, if they can be told without reading it
+        try:
+            with locked(path, exclusive=True):
+                before = file_signature(path)
+                if before is None:
+                    # First write: the snapshot becomes the file
+                    checkpoint(path, copy.deepcopy(write.snapshot))
+                else:
+                    record = write.record(last_lsn(path) + 1)
+                    cached = _cache.get(path)
+                    if cached is not None and cached[0] == before:
+                        # Nobody else wrote since it was read: apply the change in memory
+                        settings = replay(copy.deepcopy(cached[1]), [record])
+                    with open(journal_path(path), 'ab') as journal:
+                        # Start on a fresh line if a crashed writer left a torn record
+                        if journal.tell() and not ends_with_newline(journal.name):
+                            journal.write(b'\n')
+                        journal.write(encode_record(record))
+                        journal.flush()
+                        os.fsync(journal.fileno())
+                        full = journal.tell() >= JOURNAL_CHECKPOINT
+                    if full:
+                        checkpoint(path, read_settings_file(path) or copy.deepcopy(write.snapshot))
+                signature = file_signature(path)
+                record_own_change(path, before, signature)
+        except IOError:
+            settings = None  # Handle file write errors silently
+        # Still in flight, so reads keep using the snapshot until this is done
+        if settings is None:
+            invalidate(path)
+        else:
+            _cache[path] = (signature, settings)
+
+
+@contextlib.contextmanager
+def locked(path: str, exclusive: bool):
+    """Hold the advisory lock of a settings file: exclusive to write, shared to read."""
+    with open(path + '.lock', 'a') as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def append_history(path: str, entries: Iterable[Dict[str, Any]]) -> None:
+    """Append scores to a history file, one JSON object per line.
+
+    Takes the history's lock, which Scores holds while it rewrites the file.
+    """
+    try:
+        with locked(path, exclusive=True), open(path, 'a') as f:
+            f.writelines(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+    except IOError:
+        pass  # Handle file write errors silently
+
+
+def journal_path(path: str) -> str:
+    return path + '.journal'
+
+
+def ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """One journal line: the CRC-32 of the JSON body, then the body."""
+    body = json.dumps(record, separators=(',', ':')).encode()
+    return b'%08x %s\n' % (zlib.crc32(body), body)
+
+
+def decode_record(line: bytes) -> Optional[Dict[str, Any]]:
+    """The record on a journal line, or None if it is torn or corrupt."""
+    checksum, _, body = line.rstrip(b'\n').partition(b' ')
+    try:
+        return json.loads(body) if int(checksum, 16) == zlib.crc32(body) else None
+    except ValueError:
+        return None
+
+
+def read_journal(path: str) -> List[Dict[str, Any]]:
+    """The intact records of a journal, in order; torn or corrupt lines are skipped."""
+    try:
+        with open(journal_path(path), 'rb') as f:
+            return [record for record in map(decode_record, f) if record is not None]
+    except OSError:
+        return []
+
+
+def last_lsn(path: str) -> int:
+    """The sequence number of the newest record in the file or its journal. Call with the lock held."""
+    try:
+        with open(journal_path(path), 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            tail = 4096
+            while True:
+                # Read back from the end until a whole record is in view
+                start = max(0, size - tail)
+                f.seek(start)
+                lines = f.read().splitlines()[1 if start else 0:]
+                for line in reversed(lines):
+                    record = decode_record(line)
+                    if record is not None and 'lsn' in record:
+                        return record['lsn']
+                if not start:
+                    break
+                tail *= 4
+    except OSError:
+        pass
+    return (read_settings_file(path) or {}).get(LSN_KEY, 0)
+
+
+def replay(settings: Dict[str, Any], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply journal records, skipping those the settings already include."""
+    lsn = settings.get(LSN_KEY, 0)
+    for record in records:
+        if record.get('lsn', lsn + 1) <= lsn:
+            continue  # checkpointed before a crash kept the journal from being emptied
+        settings = PendingWrite.from_record(record).apply(settings)
+        lsn = record.get('lsn', lsn)
+    if lsn:
+        settings[LSN_KEY] = lsn
+    return settings
+
+
+def read_current(path: str) -> Optional[Dict[str, Any]]:
+    """The settings at path with its journal applied, or None if unreadable.
+
+    Tools reading other instances' files should use this rather than parse
+    the JSON, which lags behind the journal until the next checkpoint.
+    """
+    settings = read_settings_file(path)
+    return None if settings is None else replay(settings, read_journal(path))
+
+
+def checkpoint(path: str, settings: Dict[str, Any]) -> None:
+    """Fold the journal into the file and empty it. Call with the lock held.
+
+    An unreadable file is kept as <file>.corrupt instead of being replaced
+    silently.
+    """
+    if os.path.exists(path) and read_settings_file(path) is None:
+        os.replace(path, path + '.corrupt')
+    settings = replay(settings, read_journal(path))
+    temp = f'{path}.{os.getpid()}.tmp'
+    with open(temp, 'w') as f:
+        json.dump(settings, f, indent=4)
+        # Force file system sync before the rename publishes it
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    fsync_directory(path)
+    with open(journal_path(path), 'wb') as journal:
+        os.fsync(journal.fileno())
+
+
+def fsync_directory(path: str) -> None:
+    """Make a rename in path's directory durable; not possible on every platform."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def recover(path: str) -> None:
+    """Apply what a previous run left in the journal. Cheap when it is empty."""
+    try:
+        if os.path.getsize(journal_path(path)) == 0:
+            return
+    except OSError:
+        return
+    try:
+        with locked(path, exclusive=True):
+            settings = read_settings_file(path)
+            if settings is not None:
+                checkpoint(path, settings)
+    except IOError:
+        pass
+
+
+def read_settings_file(path: str) -> Optional[Dict[str, Any]]:
+    """The settings stored at path, or None if missing or unreadable."""
+    try:
+        with open(path, 'r') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return settings if isinstance(settings, dict) else None
+
+
+_writer = SettingsWriter()
+atexit.register(_writer.flush)
+_recovered = set()  # settings files whose journal this process has replayed
+_cache: Dict[str, Tuple[Tuple, Dict[str, Any]]] = {}  # path -> (file_signature, settings)
+_watched = set()  # settings files whose changes a SettingsWatcher reports
+_written: Dict[str, List] = {}  # path -> file_signatures through this process's latest writes
+OWN_WRITES_KEPT = 64
+
+
+def file_signature(path: str) -> Optional[Tuple]:
+    """Identity and version of a settings file and its journal, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    try:
+        js = os.stat(journal_path(path))
+        journal = (js.st_mtime_ns, js.st_size)
+    except OSError:
+        journal = None
+    return (st.st_ino, st.st_mtime_ns, st.st_size, journal)
+
+
+def watch(path: str) -> None:
+    """Serve path from the cache until invalidate(), without checking the disk.
+
+    For files whose changes are reported, i.e. by a SettingsWatcher; this
+    process's own writes invalidate the cache themselves.
+    """
+    _watched.add(os.path.abspath(path))
+
+
+def record_own_change(path: str, before: Optional[Tuple], after: Optional[Tuple]) -> None:
+    """Note that this process changed path from signature before to after."""
+    chain = _written.get(path)
+    if before is None or not chain or chain[-1] != before:
+        chain = [before]  # someone else wrote since our last write
+    # A new list, so readers on other threads never see it half updated
+    _written[path] = (chain + [after])[-OWN_WRITES_KEPT:]
+
+
+def own_writes(path: str) -> List:
+    """The file_signatures path went through in this process's latest run of writes.
+
+    The first is from before the run; a write by anyone else ends the run.
+    """
+    return _written.get(os.path.abspath(path), [])
+
+
+def invalidate(path: Optional[str] = None) -> None:
+    """Forget cached settings for path, or for every file."""
+    if path is None:
+        _cache.clear()
+    else:
+        _cache.pop(os.path.abspath(path), None)
+
+
+def history_path(settings_file: str) -> str:
+    """The append-only score history kept next to a settings file."""
+    return os.path.splitext(settings_file)[0] + '.history.jsonl'
+
+
+def timestamp() -> float:
+    """Wall-clock time of a score, to the millisecond."""
+    return round(time.time(), 3)
+
+class Settings:
+    def __init__(self, settings_file: str = 'settings.json'):
+        self.settings_file = settings_file
+        self.history_file = history_path(settings_file)
         self.default_settings = {
             'grid_size': 4,
             'sound_enabled': True,
             'dark_mode': False,
+            'shared_leaderboard': False,
+            'symbol_pack': None,
             'scores': []
         }
         self.settings = self.load_settings()
 
     def load_settings(self):
         """Load settings from file or create with defaults if file doesn't exist."""
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    # Ensure all default settings exist
-                    for key, value in self.default_settings.items():
-                        if key not in settings:
-                            settings[key] = value
-                    return settings
-            except (json.JSONDecodeError, IOError):
-                return self.default_settings.copy()
-        else:
-            # Create settings file with defaults
-            self.save_settings(self.default_settings)
-            return self.default_settings.copy()
+        return copy.deepcopy(self.current())
 
-    def save_settings(self, settings):
-        """Save settings to file."""
+    def current(self) -> Dict[str, Any]:
+        """The latest settings, shared with the cache: do not modify.
+
+        Parsed files are cached per path. A watched file (see watch()) is
+        read from the cache until a change invalidates it, so get_setting
+        costs no I/O; otherwise the cache is reused until a stat shows the
+        file or its journal changed.
+        """
+        path = os.path.abspath(self.settings_file)
+        # A write still queued in the background is newer than the file
+        pending = _writer.latest(path)
+        if pending is not None:
+            return pending
+        # Finish whatever a crashed run left in the journal, once per process
+        if path not in _recovered:
+            _recovered.add(path)
+            recover(path)
+        cached = _cache.get(path)
+        if cached is not None and path in _watched:
+            return cached[1]
+        signature = file_signature(path)
+        if signature is None:
+            # Create settings file with defaults, unless another instance
+            # creates it first
+            self.submit(self.default_settings)
+            return self.default_settings
+        if cached is not None and cached[0] == signature:
+            return cached[1]
         try:
-            # Open file in write mode
-            f = open(self.settings_file, 'w')
-            # Write settings
-            json.dump(settings, f, indent=4)
-            # Force file system sync
-            f.flush()
-            os.fsync(f.fileno())
-            # Close file
-            f.close()
+            # The file plus the journaled changes not yet checkpointed
+            with locked(path, exclusive=False):
+                settings = read_current(path)
         except IOError:
-            pass  # Handle file write errors silently
+            settings = None
+        if settings is None:
+            return self.default_settings
+        # Ensure all default settings exist
+        for key, value in self.default_settings.items():
+            if key not in settings:
+                settings[key] = copy.deepcopy(value)
+        _cache[path] = (signature, settings)
+        return settings
+
+    @traced('Settings.save_settings')
+    def save_settings(self, settings):
+        """Save settings to file in the background, overwriting every key.
+
+        The snapshot is copied now, so later changes to settings don't leak
+        into the queued write.
+        """
+        self.submit(settings, updates=settings)
+
+    def submit(self, snapshot: Dict[str, Any], updates: Optional[Dict[str, Any]] = None,
+               added: Optional[List[Dict[str, Any]]] = None, limit: Optional[int] = None,
+               history: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Queue a change: keys to overwrite, scores to keep the top `limit` of, history to append."""
+        write = PendingWrite(copy.deepcopy(snapshot), copy.deepcopy(updates or {}),
+                             copy.deepcopy(added or []), limit, copy.deepcopy(history or []))
+        _writer.submit(os.path.abspath(self.settings_file), write)
+
+    @staticmethod
+    def flush(timeout: Optional[float] = None) -> bool:
+        """Wait for all queued settings writes to reach the disk."""
+        return _writer.flush(timeout)
 
     def get_setting(self, key, default=None):
         """Get a setting value."""
-        # Always read from file to ensure latest value
-        settings = self.load_settings()
-        return settings.get(key, default)
+        value = self.current().get(key, default)
+        # Lists and dicts are copied so callers can't modify the cache
+        return copy.deepcopy(value) if isinstance(value, (list, dict)) else value
 
     def set_setting(self, key, value):
         """Set a setting value and save to file."""
@@ -58,8 +503,8 @@ class Settings:
         settings = self.load_settings()
         # Update setting
         settings[key] = value
-        # Save to file
-        self.save_settings(settings)
+        # Save to file; only this key is written over the file's contents
+        self.submit(settings, updates={key: value})
         # Update local cache
         self.settings = settings
 
@@ -68,24 +513,44 @@ class Settings:
         self.settings = self.default_settings.copy()
         self.save_settings(self.settings)
 
-    def add_score(self, name: str, moves: int, time: int) -> None:
-        """Add a new score to the scoreboard."""
-        scores = self.settings.get('scores', [])
-        scores.append({
+    def add_score(self, name: str, moves: int, time: int, grid_size: Optional[int] = None) -> Dict[str, Any]:
+        """Add a new score to the scoreboard and the score history, and return it.
+
+        settings.json keeps only the best scores; every score is also
+        appended to the history file, which the Scores CLI works from.
+        """
+        entry = {
             'name': name,
             'moves': moves,
-            'time': time
-        })
-        # Keep only top 10 scores
-        scores.sort(key=lambda x: (x['moves'], x['time']))
-        self.settings['scores'] = scores[:10]
-        self.save_settings(self.settings)
+            'time': time,
+            'grid_size': grid_size,
+            'timestamp': timestamp()
+        }
+        self.add_scores([entry], history=True)
+        return entry
+
+    def add_scores(self, entries: Iterable[Dict[str, Any]], limit: Optional[int] = 10,
+                   history: bool = False) -> None:
+        """Add many scores with a single sort and a single write.
+
+        Keeps the best `limit` scores, or all of them when limit is None.
+        With history, the same write appends them to the history file.
+        """
+        entries = list(entries)
+        # Start from the latest saved state; the writer merges the new
+        # entries into whatever is on disk when it writes
+        self.settings = self.load_settings()
+        scores = self.settings.get('scores', [])
+        scores.extend(entries)
+        scores.sort(key=score_key)
+        self.settings['scores'] = scores[:limit]
+        self.submit(self.settings, added=entries, limit=limit, history=entries if history else None)
 
     def clear_scores(self) -> None:
         """Clear all scores."""
         self.settings['scores'] = []
-        self.save_settings(self.settings)
+        self.submit(self.settings, updates={'scores': []})
 
     def get_scores(self) -> list:
         """Get all scores."""
-        return self.settings.get('scores', []) 
\ No newline at end of file
+        return self.get_setting('scores', []) 
\ No newline at end of file
@@ -71,6 +71,18 @@ class SettingsScreen(QWidget):
         back_btn.clicked.connect(lambda: self.parent.stacked_widget.setCurrentWidget(self.parent.main_menu))
         layout.addWidget(back_btn)
 
+    def refresh(self):
+        """Show the stored values again, e.g. after another instance changed them."""
+        grid_size = self.settings.get_setting('grid_size', 4)
+        # Don't echo the stored values back through the change handlers
+        self.grid_size_combo.blockSignals(True)
+        self.grid_size_combo.setCurrentText(f"{grid_size}x{grid_size}")
+        self.grid_size_combo.blockSignals(False)
+        self.dark_mode_checkbox.blockSignals(True)
+        self.dark_mode_checkbox.setChecked(self.settings.get_setting('dark_mode', False))
+        self.dark_mode_checkbox.blockSignals(False)
+        self.update_container_style()
+
     def update_container_style(self):
         is_dark_mode = self.settings.get_setting('dark_mode', False)
         bg_color = '#404040' if is_dark_mode else '#ffffff'
@@ -0,0 +1,56 @@
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, pyqtSignal
+from Scheduler import Scheduler
+from Settings import file_signature, invalidate, journal_path, own_writes, watch
+
+DEBOUNCE = 50  # ms to let a burst of file events settle
+
+
+class SettingsWatcher(QObject):
+    """Tell the UI when a settings file changes on disk, e.g. from another instance.
+
+    Writes replace the file by renaming over it, which drops it from a
+    QFileSystemWatcher, so the directory is watched too and the files are
+    re-added on every event. Events are debounced and only reported when the
+    file or its journal actually changed, and not only by this process: if
+    its own writes account for the whole change (see own_writes()), the
+    event is dropped.
+
+    While watched, Settings serves the file from memory and relies on this
+    to invalidate it.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self, settings_file: str = 'settings.json', parent=None):
+        super().__init__(parent)
+        self.path = os.path.abspath(settings_file)
+        self.signature = file_signature(self.path)
+        watch(self.path)
+        self.scheduler = Scheduler(self)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.addPath(os.path.dirname(self.path))
+        self.watch_files()
+        self.watcher.fileChanged.connect(self.on_event)
+        self.watcher.directoryChanged.connect(self.on_event)
+
+    def watch_files(self):
+        watched = self.watcher.files()
+        for path in (self.path, journal_path(self.path)):
+            if path not in watched and os.path.exists(path):
+                self.watcher.addPath(path)
+
+    def on_event(self, path):
+        self.watch_files()
+        if not self.scheduler.live:
+            self.scheduler.call_later(DEBOUNCE, self.check)
+
+    def check(self):
+        signature = file_signature(self.path)
+        if signature == self.signature:
+            return
+        previous, self.signature = self.signature, signature
+        chain = own_writes(self.path)
+        if chain and chain[-1] == signature and previous in chain[:-1]:
+            return  # only our own writes, which refreshed the cache already
+        invalidate(self.path)
+        self.changed.emit()
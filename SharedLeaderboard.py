@@ -0,0 +1,246 @@
+import hashlib
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+from Leaderboard import score_key
+from Settings import Settings, locked
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
+# Fixed layout of the segment, all little-endian:
+#
+#   header  magic, layout version, seqlock counter, generation
+#   tables  MAX_TABLES x (grid_size, count, TOP_N x entry)
+#   entry   name (utf-8, NUL padded), moves, time, timestamp
+#
+# Writers serialize on the settings file's advisory lock and bracket every
+# change with the seqlock: the counter is odd while a write is in progress.
+# Readers copy a table and retry if the counter moved, so reading takes no
+# lock, no I/O and no parsing beyond struct unpacking.
+
+MAGIC = b'MGLB'
+LAYOUT_VERSION = 1
+TOP_N = 10
+MAX_TABLES = 8
+NAME_BYTES = 32
+
+HEADER = struct.Struct('<4sIIQ')
+SEQ_OFFSET = 8
+TABLE_HEADER = struct.Struct('<HH')
+ENTRY = struct.Struct(f'<{NAME_BYTES}sIId')
+TABLE_SIZE = TABLE_HEADER.size + TOP_N * ENTRY.size
+SEGMENT_SIZE = HEADER.size + MAX_TABLES * TABLE_SIZE
+
+READ_RETRIES = 1000
+PERSIST_INTERVAL = 2000  # ms between the elected writer's checks
+
+
+def segment_name(settings_file: str) -> str:
+    """One segment per settings file, shared by every instance using it."""
+    digest = hashlib.blake2b(os.path.abspath(settings_file).encode(), digest_size=6).hexdigest()
+    return f'memgame-{digest}'
+
+
+class SharedLeaderboard:
+    """Top-N scores per grid size in shared memory, for instances on one host.
+
+    The first instance creates the segment from the leaderboards stored in
+    the settings file; the rest attach to it. Every instance inserts its own
+    scores, and one elected instance (whoever holds <file>.leader) persists
+    the tables back to the settings file's 'leaderboards' key. The segment
+    outlives the instances so a restart attaches to the same tables.
+    """
+
+    def __init__(self, settings_file: str = 'settings.json'):
+        self.settings = Settings(settings_file)
+        self.path = os.path.abspath(settings_file)
+        self.leader_file = None
+        self.persisted_generation = None
+        with self.locked():
+            try:
+                self.shm = shared_memory.SharedMemory(segment_name(settings_file), create=True,
+                                                      size=SEGMENT_SIZE)
+                created = True
+            except FileExistsError:
+                self.shm = shared_memory.SharedMemory(segment_name(settings_file))
+                created = False
+            # Don't let this process's exit unlink a segment others still use
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+            self.buf = self.shm.buf
+            if created or self.header()[:2] != (MAGIC, LAYOUT_VERSION):
+                self.load(self.persisted())
+
+    def close(self) -> None:
+        self.buf = None
+        self.shm.close()
+        if self.leader_file:
+            self.leader_file.close()
+            self.leader_file = None
+
+    def locked(self):
+        # Its own lock file, so writers never wait on a settings save
+        return locked(self.path + '.shm', exclusive=True)
+
+    def header(self):
+        return HEADER.unpack_from(self.buf, 0)
+
+    def persisted(self) -> Dict[str, List[Dict]]:
+        """The saved leaderboards, or ones built from the saved scores if there are none."""
+        leaderboards = self.settings.get_setting('leaderboards')
+        if leaderboards:
+            return leaderboards
+        leaderboards = {}
+        for entry in self.settings.get_scores():
+            if entry.get('grid_size'):
+                leaderboards.setdefault(str(entry['grid_size']), []).append(entry)
+        return leaderboards
+
+    def load(self, leaderboards: Dict[str, List[Dict]]) -> None:
+        """Fill the tables from persisted leaderboards. Call with the lock held."""
+        HEADER.pack_into(self.buf, 0, MAGIC, LAYOUT_VERSION, 0, 0)
+        self.begin_write()
+        tables = sorted(leaderboards.items(), key=lambda item: int(item[0]))[:MAX_TABLES]
+        for slot in range(MAX_TABLES):
+            if slot < len(tables):
+                grid_size, entries = tables[slot]
+                self.write_table(slot, int(grid_size), sorted(entries, key=score_key)[:TOP_N])
+            else:
+                self.write_table(slot, 0, [])
+        self.end_write()
+
+    # Seqlock
+
+    def sequence(self) -> int:
+        return struct.unpack_from('<I', self.buf, SEQ_OFFSET)[0]
+
+    def begin_write(self) -> None:
+        _, _, seq, generation = self.header()
+        # A writer that died mid-write leaves the counter odd; keep it odd
+        HEADER.pack_into(self.buf, 0, MAGIC, LAYOUT_VERSION, seq | 1, generation)
+
+    def end_write(self) -> None:
+        _, _, seq, generation = self.header()
+        HEADER.pack_into(self.buf, 0, MAGIC, LAYOUT_VERSION, seq + 1, generation + 1)
+
+    # Tables
+
+    def table_offset(self, slot: int) -> int:
+        return HEADER.size + slot * TABLE_SIZE
+
+    def write_table(self, slot: int, grid_size: int, entries: List[Dict]) -> None:
+        offset = self.table_offset(slot)
+        TABLE_HEADER.pack_into(self.buf, offset, grid_size, len(entries))
+        offset += TABLE_HEADER.size
+        for entry in entries:
+            name = str(entry.get('name', '')).encode()[:NAME_BYTES]
+            ENTRY.pack_into(self.buf, offset, name, entry['moves'], entry['time'],
+                            entry.get('timestamp') or 0.0)
+            offset += ENTRY.size
+
+    @staticmethod
+    def decode_table(raw: bytes) -> (int, List[Dict]):
+        grid_size, count = TABLE_HEADER.unpack_from(raw, 0)
+        entries = []
+        for name, moves, seconds, stamp in ENTRY.iter_unpack(raw[TABLE_HEADER.size:
+                                                               TABLE_HEADER.size + count * ENTRY.size]):
+            entries.append({'name': name.rstrip(b'\0').decode(errors='ignore'), 'moves': moves,
+                            'time': seconds, 'grid_size': grid_size, 'timestamp': stamp})
+        return grid_size, entries
+
+    def snapshot(self) -> bytes:
+        """A consistent copy of all tables, retried while a writer is active."""
+        for _ in range(READ_RETRIES):
+            seq = self.sequence()
+            if seq % 2 == 0:
+                raw = bytes(self.buf[HEADER.size:SEGMENT_SIZE])
+                if self.sequence() == seq:
+                    return raw
+            time.sleep(0)
+        # A writer died mid-write; its table may be half written, but the
+        # next insert rewrites every table
+        return bytes(self.buf[HEADER.size:SEGMENT_SIZE])
+
+    def tables(self) -> Dict[int, List[Dict]]:
+        raw = self.snapshot()
+        tables = {}
+        for slot in range(MAX_TABLES):
+            grid_size, entries = self.decode_table(raw[slot * TABLE_SIZE:(slot + 1) * TABLE_SIZE])
+            if grid_size:
+                tables[grid_size] = entries
+        return tables
+
+    def top(self, grid_size: int) -> List[Dict]:
+        """The best scores on a grid size, best first."""
+        raw = self.snapshot()
+        for slot in range(MAX_TABLES):
+            table = raw[slot * TABLE_SIZE:(slot + 1) * TABLE_SIZE]
+            if TABLE_HEADER.unpack_from(table, 0)[0] == grid_size:
+                return self.decode_table(table)[1]
+        return []
+
+    def rank(self, grid_size: int, moves: int, seconds: int) -> Optional[int]:
+        """1-based place a score would take on its board, or None if it misses the top N."""
+        key = (moves, seconds)
+        entries = self.top(grid_size)
+        place = sum(1 for entry in entries if score_key(entry) <= key) + 1
+        return place if place <= TOP_N else None
+
+    def insert(self, entry: Dict) -> Optional[int]:
+        """Add a score to its grid's table. Returns its rank, or None if it didn't place."""
+        grid_size = entry.get('grid_size') or 0
+        with self.locked():
+            tables = self.tables()
+            if grid_size not in tables and len(tables) >= MAX_TABLES:
+                return None
+            entries = tables.get(grid_size, [])
+            entries.append(entry)
+            entries.sort(key=score_key)
+            if entry not in entries[:TOP_N]:
+                return None
+            tables[grid_size] = entries[:TOP_N]
+            self.begin_write()
+            for slot, (size, rows) in enumerate(sorted(tables.items())):
+                self.write_table(slot, size, rows)
+            self.end_write()
+            return entries.index(entry) + 1
+
+    def clear(self) -> None:
+        """Empty every table, and the persisted copy so it can't bring them back."""
+        with self.locked():
+            self.begin_write()
+            for slot in range(MAX_TABLES):
+                self.write_table(slot, 0, [])
+            self.end_write()
+            self.persisted_generation = self.header()[3]
+        self.settings.set_setting('leaderboards', {})
+
+    # Persistence by the elected writer
+
+    def is_leader(self) -> bool:
+        """Try to become the persisting instance; the lock is held until close()."""
+        if self.leader_file:
+            return True
+        handle = open(self.path + '.leader', 'a')
+        try:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self.leader_file = handle
+        return True
+
+    def persist(self) -> bool:
+        """If elected, write the tables to the settings file when they changed."""
+        generation = self.header()[3]
+        if generation == self.persisted_generation or not self.is_leader():
+            return False
+        tables = self.tables()
+        self.settings.set_setting('leaderboards', {str(size): rows for size, rows in tables.items()})
+        self.persisted_generation = generation
+        return True
@@ -0,0 +1,185 @@
+import random
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+from Utils import create_card_pairs
+
+# Perfect-memory model
+#
+# A player with perfect memory never forgets a card once it has been seen,
+# so the only thing that matters is how many pairs are still completely
+# unseen (n) and how many pairs have exactly one card seen (k). Pairs with
+# both cards seen are always matched straight away, so they never appear
+# in a state.
+#
+# The model assumes every symbol is on exactly one pair. Deals can repeat a
+# symbol across pairs (CARD_SYMBOLS has duplicates, and big boards reuse
+# symbols), which makes them easier, so their baseline is measured instead:
+# perfect_memory_moves averaged over DEAL_SAMPLES reveal orders.
+
+DEAL_SAMPLES = 64
+
+
+@lru_cache(maxsize=None)
+def _expected(n: int, k: int) -> float:
+    """Expected remaining moves from state (n, k) under optimal play."""
+    unseen = 2 * n + k
+    if unseen == 0:
+        return 0.0
+    if n == 0:
+        # Every unseen card completes a known pair
+        return float(k)
+
+    total = 0.0
+    if k:
+        # First card completes a known pair: flip its partner and match
+        total += (k / unseen) * (1 + _expected(n, k - 1))
+    # First card starts a new pair: choose the cheaper second flip
+    total += (2 * n / unseen) * min(_flip_unseen(n, k), _flip_known(n, k))
+    return total
+
+
+def _flip_unseen(n: int, k: int) -> float:
+    """Expected cost of revealing an unseen card as the second flip."""
+    remaining = 2 * n + k - 1
+    cost = (1 / remaining) * (1 + _expected(n - 1, k))
+    if k:
+        # Mismatch that completes a known pair, matched on the next move
+        cost += (k / remaining) * (2 + _expected(n - 1, k))
+    if n > 1:
+        # Mismatch between two cards from new pairs
+        cost += (2 * (n - 1) / remaining) * (1 + _expected(n - 2, k + 2))
+    return cost
+
+
+def _flip_known(n: int, k: int) -> float:
+    """Expected cost of deliberately flipping a known card as the second flip."""
+    if not k:
+        return float('inf')
+    return 1 + _expected(n - 1, k + 1)
+
+
+_precomputed_pairs = 0
+
+
+def precompute(max_pairs: int) -> None:
+    """Fill the memo table up to max_pairs in increasing order of unseen cards.
+
+    Filling bottom-up keeps recursion shallow, so later lookups for any board
+    up to this size are a single dictionary hit.
+    """
+    global _precomputed_pairs
+    if max_pairs <= _precomputed_pairs:
+        return
+    for unseen in range(2 * max_pairs + 1):
+        for n in range(unseen // 2 + 1):
+            k = unseen - 2 * n
+            if n + k <= max_pairs:
+                _expected(n, k)
+    _precomputed_pairs = max_pairs
+
+
+def expected_moves(pairs: int, known: int = 0) -> float:
+    """Expected moves to clear a board of the given size with perfect memory."""
+    precompute(pairs + known)
+    return _expected(pairs, known)
+
+
+def should_flip_known(n: int, k: int) -> bool:
+    """Whether the optimal second flip from state (n, k) is a known card."""
+    return _flip_known(n, k) < _flip_unseen(n, k)
+
+
+def perfect_memory_moves(cards: Sequence[str], order: Optional[Sequence[int]] = None) -> int:
+    """Play a deal with the optimal perfect-memory strategy and count moves.
+
+    Unseen cards are revealed in the given order (board order by default),
+    which models a player who cannot see through the cards. Cards match on
+    symbol equality, exactly like MemoryGame does.
+    """
+    if order is None:
+        order = range(len(cards))
+    pending = list(reversed(order))  # pop() from the end is O(1)
+    seen: Dict[str, List[int]] = {}
+    matched = 0
+    moves = 0
+    total = len(cards)
+
+    def known_count() -> int:
+        return sum(1 for indices in seen.values() if indices)
+
+    while matched < total:
+        # Match any symbol with two cards already seen
+        ready = next((s for s, idx in seen.items() if len(idx) >= 2), None)
+        if ready is not None:
+            seen[ready] = seen[ready][2:]
+            matched += 2
+            moves += 1
+            continue
+
+        first = pending.pop()
+        symbol = cards[first]
+        if seen.get(symbol):
+            seen[symbol].pop()
+            matched += 2
+            moves += 1
+            continue
+
+        k = known_count()
+        # The first card starts a new pair, so at least one is unseen
+        n = max(1, (len(pending) + 1 - k) // 2)
+        moves += 1
+        if k and should_flip_known(n, k):
+            seen.setdefault(symbol, []).append(first)
+            continue
+
+        second = pending.pop()
+        if cards[second] == symbol:
+            matched += 2
+            continue
+        seen.setdefault(symbol, []).append(first)
+        seen.setdefault(cards[second], []).append(second)
+
+    return moves
+
+
+def expected_deal_moves(cards: Sequence[str]) -> float:
+    """Expected perfect-memory moves for this deal, accounting for repeated symbols."""
+    if all(count == 2 for count in Counter(cards).values()):
+        return expected_moves(len(cards) // 2)
+    return _sampled_moves(tuple(cards))
+
+
+@lru_cache(maxsize=256)
+def _sampled_moves(cards: Tuple[str, ...]) -> float:
+    # Seeded by the deal, so the same deal always gets the same baseline
+    rng = random.Random('\0'.join(cards))
+    order = list(range(len(cards)))
+    total = 0
+    for _ in range(DEAL_SAMPLES):
+        rng.shuffle(order)
+        total += perfect_memory_moves(cards, order)
+    return total / DEAL_SAMPLES
+
+
+def efficiency(moves: int, cards: Sequence[str]) -> float:
+    """Ratio of the deal's expected perfect-memory moves to the moves actually taken."""
+    if moves <= 0:
+        return 0.0
+    return expected_deal_moves(cards) / moves
+
+
+def solve_deal(cards: Sequence[str]) -> Dict[str, float]:
+    """Summarise the move bounds for a deal."""
+    pairs = len(cards) // 2
+    return {
+        'pairs': pairs,
+        'lower_bound': pairs,
+        'expected': expected_deal_moves(cards),
+        'perfect_memory': perfect_memory_moves(cards),
+    }
+
+
+def solve_seed(seed: int, grid_size: int = 4) -> Dict[str, float]:
+    """Summarise the move bounds for the deal produced by a seed."""
+    return solve_deal(create_card_pairs(grid_size, seed))
@@ -1,13 +1,17 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint, QSequentialAnimationGroup, QParallelAnimationGroup
+from PyQt5.QtCore import Qt, QRectF, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint, QSequentialAnimationGroup, QParallelAnimationGroup
 from PyQt5.QtGui import QFont, QPainter, QColor, QPen
 from PyQt5.QtWidgets import QApplication
+from Scheduler import Scheduler
+from SymbolAtlas import atlas_for
+from Utils import SPLASH_SYMBOLS
 
 class AnimatedElement(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._opacity = 0.0
         self._y_offset = 50  # Start 50 pixels below final position
+        self.scheduler = Scheduler(self)
 
     def setup_animation(self, delay):
         """Set up the element's animation."""
@@ -26,7 +30,7 @@ class AnimatedElement(QWidget):
         self.slide_anim.setEasingCurve(QEasingCurve.OutCubic)
 
         # Start animations with delay
-        QTimer.singleShot(delay, self.start_animation)
+        self.scheduler.call_later(delay, self.start_animation)
 
     def start_animation(self):
         """Start both animations."""
@@ -64,6 +68,7 @@ class AnimatedLabel(QLabel):
         self.setStyleSheet("color: white;")
         self._opacity = 0.0
         self._y_offset = 50
+        self.scheduler = Scheduler(self)
 
     def setup_animation(self, delay):
         """Set up the element's animation."""
@@ -82,7 +87,7 @@ class AnimatedLabel(QLabel):
         self.slide_anim.setEasingCurve(QEasingCurve.OutCubic)
 
         # Start animations with delay
-        QTimer.singleShot(delay, self.start_animation)
+        self.scheduler.call_later(delay, self.start_animation)
 
     def start_animation(self):
         """Start both animations."""
@@ -131,6 +136,7 @@ class AnimatedButton(QPushButton):
         """)
         self._opacity = 0.0
         self._y_offset = 50
+        self.scheduler = Scheduler(self)
 
     def setup_animation(self, delay):
         """Set up the element's animation."""
@@ -149,7 +155,7 @@ class AnimatedButton(QPushButton):
         self.slide_anim.setEasingCurve(QEasingCurve.OutCubic)
 
         # Start animations with delay
-        QTimer.singleShot(delay, self.start_animation)
+        self.scheduler.call_later(delay, self.start_animation)
 
     def start_animation(self):
         """Start both animations."""
@@ -187,6 +193,7 @@ class AnimatedCard(QWidget):
         self._is_flipped = False
         self._opacity = 0.0
         self._rotation_angle = 0
+        self.scheduler = Scheduler(self)
         self.setStyleSheet("""
             QWidget {
                 background-color: #3498db;
@@ -202,7 +209,7 @@ class AnimatedCard(QWidget):
         self.fade_anim.setStartValue(0.0)
         self.fade_anim.setEndValue(1.0)
         self.fade_anim.setEasingCurve(QEasingCurve.OutCubic)
-        QTimer.singleShot(fade_delay, self.fade_anim.start)
+        self.scheduler.call_later(fade_delay, self.fade_anim.start)
 
         # Flip animation (front)
         self.flip_anim_front = QPropertyAnimation(self, b"rotation_angle")
@@ -210,7 +217,7 @@ class AnimatedCard(QWidget):
         self.flip_anim_front.setStartValue(0)
         self.flip_anim_front.setEndValue(180)
         self.flip_anim_front.setEasingCurve(QEasingCurve.OutCubic)
-        QTimer.singleShot(flip_front_delay, self.flip_anim_front.start)
+        self.scheduler.call_later(flip_front_delay, self.flip_anim_front.start)
 
         # Flip animation (back)
         self.flip_anim_back = QPropertyAnimation(self, b"rotation_angle")
@@ -218,7 +225,7 @@ class AnimatedCard(QWidget):
         self.flip_anim_back.setStartValue(180)
         self.flip_anim_back.setEndValue(360)
         self.flip_anim_back.setEasingCurve(QEasingCurve.OutCubic)
-        QTimer.singleShot(flip_back_delay, self.flip_anim_back.start)
+        self.scheduler.call_later(flip_back_delay, self.flip_anim_back.start)
 
     @pyqtProperty(float)
     def opacity(self):
@@ -255,11 +262,8 @@ class AnimatedCard(QWidget):
 
         # Draw symbol or back
         if self._rotation_angle > 90 and self._rotation_angle < 270:
-            # Show symbol (flipped side)
-            painter.setPen(QPen(QColor("white")))
-            font = QFont('Arial', 36, QFont.Bold)
-            painter.setFont(font)
-            painter.drawText(self.rect(), Qt.AlignCenter, self.symbol)
+            # Show symbol (flipped side), from the shared atlas
+            atlas_for(self.width(), self.devicePixelRatioF()).draw(painter, [(self.symbol, QRectF(self.rect()))])
         else:
             # Show card back (front side)
             painter.setPen(QPen(QColor("white")))
@@ -274,6 +278,7 @@ class SplashScreen(QWidget):
         self.setAttribute(Qt.WA_TranslucentBackground)
         self._opacity = 1.0  # Initialize opacity
         self._y_offset = 0.0  # Initialize y_offset
+        self.scheduler = Scheduler(self)
         self.setup_ui()
         self.setup_animation()
         
@@ -317,8 +322,7 @@ class SplashScreen(QWidget):
         content_layout.addLayout(self.card_grid_layout)
 
         self.animated_cards = []
-        symbols = ['😀', '😂', '😎', '👍']
-        for i, symbol in enumerate(symbols):
+        for i, symbol in enumerate(SPLASH_SYMBOLS):
             card = AnimatedCard(symbol)
             self.card_grid_layout.addWidget(card)
             self.animated_cards.append(card)
@@ -350,13 +354,13 @@ class SplashScreen(QWidget):
         self.fade_out_anim.setEasingCurve(QEasingCurve.InOutCubic)
         
         # Schedule the fade out and transition
-        QTimer.singleShot(total_animation_duration, self.start_fade_out)
+        self.scheduler.call_later(total_animation_duration, self.start_fade_out)
 
     def start_fade_out(self):
         """Start the fade out animation."""
         self.fade_out_anim.start()
         # Wait for fade out to complete before showing menu
-        QTimer.singleShot(500, self.on_animation_finished)
+        self.scheduler.call_later(500, self.on_animation_finished)
 
     def on_animation_finished(self):
         """Called when all splash screen animations are finished."""
@@ -365,6 +369,13 @@ class SplashScreen(QWidget):
             main_window.show_menu()
             self.hide()
 
+    def hideEvent(self, event):
+        """Drop the rest of the intro once another screen takes over."""
+        super().hideEvent(event)
+        self.scheduler.cancel_all()
+        for card in self.animated_cards:
+            card.scheduler.cancel_all()
+
     @pyqtProperty(float)
     def opacity(self):
         return self._opacity
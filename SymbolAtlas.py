@@ -0,0 +1,128 @@
+import math
+from typing import Dict, Iterable, List, Tuple
+from PyQt5.QtCore import Qt, QRect, QRectF
+from PyQt5.QtGui import QColor, QFont, QImage, QPainter, QPixmap
+from Utils import CARD_FRONT_COLOR, CARD_SYMBOLS, SPLASH_SYMBOLS
+
+# Every symbol is rasterized once per cell size and device pixel ratio into a
+# single sprite sheet. Painters then draw any number of cards from it with one
+# drawPixmapFragments call. A sheet takes about a millisecond to rasterize
+# once the fonts are loaded, which is no slower than reading one back from
+# disk, so sheets are only kept in memory.
+
+FACE = '\0face'  # the face-up card background, drawn under a symbol
+FACE_RADIUS = 8
+IMAGE_SCALE = 0.6  # share of a cell an image symbol fills
+
+_atlases: Dict[Tuple[int, float], 'SymbolAtlas'] = {}
+
+
+def atlas_symbols() -> List[str]:
+    """Every symbol a card or the splash can show, without duplicates."""
+    return list(dict.fromkeys(CARD_SYMBOLS + SPLASH_SYMBOLS))
+
+
+def symbol_font(size: int) -> QFont:
+    font = QFont('Arial')
+    font.setPixelSize(max(1, size // 2))  # as the card buttons' font-size
+    return font
+
+
+def atlas_for(size: int, dpr: float = 1.0) -> 'SymbolAtlas':
+    """The shared atlas for cells of size logical pixels at a device pixel ratio."""
+    key = (size, dpr)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = SymbolAtlas.build(size, dpr, atlas_symbols())
+    return atlas
+
+
+class SymbolAtlas:
+    """A sprite sheet of symbols with the source rectangle of each.
+
+    Sheets are plain QImages, so they can be built on any thread; the
+    pixmap drawn from is made on first use, on the GUI thread.
+    """
+
+    def __init__(self, size: int, dpr: float, image: QImage, index: Dict[str, QRect]):
+        self.size = size
+        self.dpr = dpr
+        self.image = image
+        self.index = index
+        self._pixmap = None
+
+    @property
+    def pixmap(self) -> QPixmap:
+        if self._pixmap is None:
+            self._pixmap = QPixmap.fromImage(self.image)
+        return self._pixmap
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    @classmethod
+    def build(cls, size: int, dpr: float, symbols: List[str]) -> 'SymbolAtlas':
+        """Rasterize the card face and every symbol into one image."""
+        font = symbol_font(size)
+        font.setPixelSize(max(1, round(font.pixelSize() * dpr)))
+
+        def draw(painter, rect, symbol):
+            painter.setFont(font)
+            painter.setPen(QColor('black'))
+            painter.drawText(rect, Qt.AlignCenter, symbol)
+        return cls.sheet(size, dpr, symbols, draw)
+
+    @classmethod
+    def compose(cls, size: int, dpr: float, images: Dict[str, QImage]) -> 'SymbolAtlas':
+        """Scale image symbols into one sheet; safe off the GUI thread."""
+        def draw(painter, rect, symbol):
+            image = images[symbol]
+            fitted = image.size().scaled(round(rect.width() * IMAGE_SCALE), round(rect.height() * IMAGE_SCALE),
+                                         Qt.KeepAspectRatio)
+            target = QRect(0, 0, fitted.width(), fitted.height())
+            target.moveCenter(rect.center())
+            painter.drawImage(target, image)
+        return cls.sheet(size, dpr, list(images), draw)
+
+    @classmethod
+    def sheet(cls, size: int, dpr: float, symbols: List[str], draw) -> 'SymbolAtlas':
+        """Lay out the card face and symbols in square cells, painting each with draw."""
+        cell = math.ceil(size * dpr)
+        names = [FACE] + symbols
+        columns = math.ceil(math.sqrt(len(names)))
+        rows = math.ceil(len(names) / columns)
+        image = QImage(columns * cell, rows * cell, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        index = {}
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for i, name in enumerate(names):
+            row, column = divmod(i, columns)
+            rect = QRect(column * cell, row * cell, cell, cell)
+            index[name] = rect
+            if name == FACE:
+                painter.save()
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor(CARD_FRONT_COLOR))
+                painter.drawRoundedRect(QRectF(rect), FACE_RADIUS * dpr, FACE_RADIUS * dpr)
+                painter.restore()
+            else:
+                draw(painter, rect, name)
+        painter.end()
+        image.setDevicePixelRatio(dpr)
+        return cls(size, dpr, image, index)
+
+    def fragment(self, name: str, target: QRectF) -> QPainter.PixmapFragment:
+        """Draw the cell of name scaled into target (logical pixels)."""
+        source = self.index[name]
+        return QPainter.PixmapFragment.create(
+            target.center(), QRectF(source),
+            target.width() / source.width(), target.height() / source.height())
+
+    def draw(self, painter: QPainter, cells: Iterable[Tuple[str, QRectF]]) -> None:
+        """Draw (name, target) cells in order with a single call."""
+        fragments = [self.fragment(name, target) for name, target in cells]
+        if fragments:
+            painter.drawPixmapFragments(fragments, self.pixmap)
@@ -0,0 +1,174 @@
+import io
+import json
+import mmap
+import struct
+import threading
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from PyQt5.QtGui import QImage
+from SymbolAtlas import SymbolAtlas
+
+# A pack is a zip archive whose first member is manifest.json:
+#
+#   {
+#     "name": "Animals",
+#     "symbols": {"cat": "images/cat.png", "dog": "images/dog.png", ...},
+#     "theme": {"light": {"primary": "#..."}, "dark": {...}}
+#   }
+#
+# "symbols" maps each symbol's id to its image inside the archive; "theme"
+# is optional and overrides colours of the built-in themes. The archive is
+# memory-mapped and the manifest is read straight from its local header at
+# the start, so opening a pack never walks the archive's directory. That
+# happens on the decoder thread, which loads only the images of the current
+# deal. write_pack() puts the manifest first; other archives still work, but
+# are indexed in full when opened.
+
+MANIFEST = 'manifest.json'
+PACK_ERRORS = (OSError, ValueError, KeyError, TypeError, AttributeError, zipfile.BadZipFile, zlib.error)
+
+LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+LOCAL_SIGNATURE = b'PK\x03\x04'
+ENCRYPTED, DATA_DESCRIPTOR = 0x1, 0x8
+
+_decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pack-decoder')
+
+
+def write_pack(path: str, manifest: Dict, files: Dict[str, bytes]) -> None:
+    """Write a pack with its manifest first; files maps archive names to contents."""
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(MANIFEST, json.dumps(manifest), zipfile.ZIP_DEFLATED)
+        for name, data in files.items():
+            archive.writestr(name, data)  # images are compressed already
+
+
+def read_first_member(mapped: mmap.mmap, name: str) -> Optional[bytes]:
+    """The first member's data if it is called name and its header holds its sizes."""
+    if len(mapped) < LOCAL_HEADER.size:
+        return None
+    (signature, _, flags, method, _, _, crc, compressed, _,
+     name_length, extra_length) = LOCAL_HEADER.unpack_from(mapped, 0)
+    if signature != LOCAL_SIGNATURE or flags & (ENCRYPTED | DATA_DESCRIPTOR):
+        return None
+    if mapped[LOCAL_HEADER.size:LOCAL_HEADER.size + name_length] != name.encode():
+        return None
+    start = LOCAL_HEADER.size + name_length + extra_length
+    data = mapped[start:start + compressed]
+    if method == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -zlib.MAX_WBITS)
+    elif method != zipfile.ZIP_STORED:
+        return None
+    return data if zlib.crc32(data) == crc else None
+
+
+class MappedFile(io.RawIOBase):
+    """A read-only file over a memory map; zipfile needs seekable(), which mmap lacks."""
+
+    def __init__(self, mapped: mmap.mmap):
+        super().__init__()
+        self.mapped = mapped
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self.mapped.seek(offset, whence)
+        return self.mapped.tell()
+
+    def tell(self) -> int:
+        return self.mapped.tell()
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        return self.mapped.read(size)
+
+    def readinto(self, buffer) -> int:
+        data = self.mapped.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class SymbolPack:
+    """Card symbols, and optionally theme colours, from a pack archive.
+
+    Nothing is read until the pack is first used.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mapped: Optional[mmap.mmap] = None
+        self.manifest: Dict = {}
+        self._archive: Optional[zipfile.ZipFile] = None
+        self.lock = threading.Lock()
+
+    def open(self) -> None:
+        """Map the archive and read its manifest; raises if either is unusable."""
+        with self.lock:
+            if self.mapped is not None:
+                return
+            with open(self.path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            data = read_first_member(mapped, MANIFEST)
+            if data is None:
+                self._archive = zipfile.ZipFile(MappedFile(mapped))
+                data = self._archive.read(MANIFEST)
+            self.manifest = json.loads(data)
+            self.mapped = mapped
+
+    def close(self) -> None:
+        with self.lock:
+            if self._archive is not None:
+                self._archive.close()
+                self._archive = None
+            if self.mapped is not None:
+                self.mapped.close()
+                self.mapped = None
+
+    @property
+    def archive(self) -> zipfile.ZipFile:
+        """The archive's directory, indexed on first use."""
+        self.open()
+        with self.lock:
+            if self._archive is None:
+                self._archive = zipfile.ZipFile(MappedFile(self.mapped))
+            return self._archive
+
+    @property
+    def name(self) -> str:
+        self.open()
+        return self.manifest.get('name', self.path)
+
+    def symbols(self) -> List[str]:
+        """Every symbol id in the pack, in manifest order."""
+        self.open()
+        return list(self.manifest['symbols'])
+
+    def theme(self, dark: bool) -> Dict[str, str]:
+        """Colour overrides for the light or dark theme."""
+        self.open()
+        return dict(self.manifest.get('theme', {}).get('dark' if dark else 'light', {}))
+
+    def read(self, symbol: str) -> bytes:
+        # ZipFile serializes reads of its shared file itself
+        return self.archive.read(self.manifest['symbols'][symbol])
+
+    def decode(self, symbols: Iterable[str], size: int, dpr: float = 1.0) -> 'Future[SymbolAtlas]':
+        """Start decoding the given symbols into an atlas of size-pixel cells."""
+        self.open()
+        return _decoder.submit(self.compose, list(dict.fromkeys(symbols)), size, dpr)
+
+    def compose(self, symbols: List[str], size: int, dpr: float) -> SymbolAtlas:
+        images = {}
+        for symbol in symbols:
+            try:
+                data = self.read(symbol)
+            except PACK_ERRORS:
+                continue  # the card falls back to showing the id
+            image = QImage.fromData(data)
+            if not image.isNull():
+                images[symbol] = image
+        return SymbolAtlas.compose(size, dpr, images)
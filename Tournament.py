@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from Bot import STRATEGIES, ForgetfulStrategy, play_headless
+from Leaderboard import merge_scores
+from Settings import Settings, read_current
+
+DEFAULT_GRIDS = (4, 6, 8)
+DEFAULT_STRATEGIES = ('random', 'perfect', 'forgetful-4', 'forgetful-8')
+
+# One match of the tournament: (strategy name, seed, grid size)
+Match = Tuple[str, int, int]
+
+
+def make_strategy(name: str, seed: int):
+    """Build a strategy from its name; forgetful-<k> sets the memory size."""
+    if name.startswith('forgetful-'):
+        return ForgetfulStrategy(int(name.split('-', 1)[1]), seed=seed)
+    return STRATEGIES[name](seed=seed)
+
+
+def build_matrix(strategies: Sequence[str], seeds: int, grids: Sequence[int]) -> List[Match]:
+    """Every strategy against every seed on every grid."""
+    return list(product(strategies, range(seeds), grids))
+
+
+def shard(matches: List[Match], shards: int) -> List[List[Match]]:
+    """Deal matches round-robin so big and small boards spread evenly."""
+    return [matches[i::shards] for i in range(shards) if matches[i::shards]]
+
+
+def shard_store_path(out_dir: str, shard_id: int) -> str:
+    return os.path.join(out_dir, f'shard-{shard_id:03d}.json')
+
+
+def run_shard(shard_id: int, matches: List[Match], out_dir: str) -> Dict[str, Dict[str, float]]:
+    """Play a shard, store its scores in one write and return its totals.
+
+    Runs in a worker process. Each shard owns its own scoreboard store, so
+    workers never contend for a file.
+    """
+    entries = []
+    totals: Dict[str, Dict[str, float]] = {}
+    for name, seed, grid_size in matches:
+        result = play_headless(make_strategy(name, seed), grid_size, seed)
+        entries.append({
+            'name': name,
+            'moves': result['moves'],
+            'time': round(result['game_seconds']),
+            'grid_size': grid_size,
+            'seed': seed,
+            'efficiency': result['efficiency'],
+        })
+        bucket = totals.setdefault(f'{name}@{grid_size}', {'games': 0, 'moves': 0, 'efficiency': 0.0})
+        bucket['games'] += 1
+        bucket['moves'] += result['moves']
+        bucket['efficiency'] += result['efficiency']
+
+    store = Settings(shard_store_path(out_dir, shard_id))
+    store.add_scores(entries, limit=None)
+    # Pool workers exit without running atexit hooks, so flush explicitly
+    store.flush()
+    return totals
+
+
+def read_shard(path: str, grid_size: int) -> Iterator[Dict]:
+    """Ranked scores for one grid size from a shard store."""
+    scores = (read_current(path) or {}).get('scores', [])
+    return (entry for entry in scores if entry.get('grid_size') == grid_size)
+
+
+def merge_leaderboard(paths: Sequence[str], grids: Sequence[int], top: int) -> Dict[int, List[Dict]]:
+    """k-way merge the ranked shard stores into a top-N board per grid."""
+    return {grid_size: list(merge_scores((read_shard(p, grid_size) for p in paths), top))
+            for grid_size in grids}
+
+
+def run_tournament(strategies: Sequence[str] = DEFAULT_STRATEGIES, seeds: int = 100,
+                   grids: Sequence[int] = DEFAULT_GRIDS, workers: Optional[int] = None,
+                   out_dir: str = 'tournament', top: int = 10) -> Dict:
+    """Play the whole matrix across worker processes and merge the results."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    shards = shard(build_matrix(strategies, seeds, grids), workers * 4)
+
+    totals: Dict[str, Dict[str, float]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, shard_id, matches, out_dir)
+                   for shard_id, matches in enumerate(shards)]
+        for future in futures:
+            for key, bucket in future.result().items():
+                merged = totals.setdefault(key, {'games': 0, 'moves': 0, 'efficiency': 0.0})
+                for field, value in bucket.items():
+                    merged[field] += value
+
+    summary = {key: {'games': bucket['games'],
+                     'mean_moves': bucket['moves'] / bucket['games'],
+                     'mean_efficiency': bucket['efficiency'] / bucket['games']}
+               for key, bucket in sorted(totals.items())}
+    paths = [shard_store_path(out_dir, shard_id) for shard_id in range(len(shards))]
+    leaderboard = merge_leaderboard(paths, grids, top)
+    with open(os.path.join(out_dir, 'leaderboard.json'), 'w') as f:
+        json.dump({'summary': summary, 'leaderboard': leaderboard}, f, indent=4)
+    return {'summary': summary, 'leaderboard': leaderboard}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a bot tournament')
+    parser.add_argument('--strategies', nargs='+', default=list(DEFAULT_STRATEGIES))
+    parser.add_argument('--seeds', type=int, default=100)
+    parser.add_argument('--grids', nargs='+', type=int, default=list(DEFAULT_GRIDS))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='tournament')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    result = run_tournament(args.strategies, args.seeds, args.grids, args.workers, args.out, args.top)
+    for key, stats in result['summary'].items():
+        print(f"{key:20} games={stats['games']:5} moves={stats['mean_moves']:7.2f} "
+              f"efficiency={stats['mean_efficiency']:.2f}")
+
+if __name__ == '__main__':
+    main()
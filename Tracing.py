@@ -0,0 +1,118 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+# Set MEMORY_GAME_TRACE=<path> to trace from startup and write the trace to
+# <path> on exit. The trace opens in chrome://tracing or ui.perfetto.dev.
+TRACE_ENV = 'MEMORY_GAME_TRACE'
+DEFAULT_CAPACITY = 100000  # spans kept in the ring buffer
+
+# Completed spans: (name, start_ns, duration_ns, thread id)
+Span = Tuple[str, int, int, int]
+
+enabled = False
+_buffer: Deque[Span] = deque(maxlen=DEFAULT_CAPACITY)
+
+
+def enable(capacity: int = DEFAULT_CAPACITY) -> None:
+    """Start recording spans, keeping only the most recent `capacity`."""
+    global enabled, _buffer
+    if _buffer.maxlen != capacity:
+        _buffer = deque(_buffer, maxlen=capacity)
+    enabled = True
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def clear() -> None:
+    _buffer.clear()
+
+
+def record(name: str, start_ns: int, duration_ns: int) -> None:
+    """Add a finished span to the ring buffer."""
+    _buffer.append((name, start_ns, duration_ns, threading.get_ident()))
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Context manager timing a block; a shared no-op while tracing is off."""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator timing every call of a function as a span."""
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def chrome_trace() -> dict:
+    """The buffered spans as Chrome trace-event JSON."""
+    pid = os.getpid()
+    return {
+        'traceEvents': [
+            {'name': name, 'ph': 'X', 'ts': start / 1000, 'dur': duration / 1000,
+             'pid': pid, 'tid': tid}
+            for name, start, duration, tid in list(_buffer)
+        ],
+        'displayTimeUnit': 'ms',
+    }
+
+
+def dump(path: str) -> None:
+    """Write the buffered spans to path as Chrome trace-event JSON."""
+    with open(path, 'w') as f:
+        json.dump(chrome_trace(), f)
+
+
+if os.environ.get(TRACE_ENV):
+    enable()
+    atexit.register(dump, os.environ[TRACE_ENV])
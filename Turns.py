@@ -0,0 +1,38 @@
+from array import array
+from typing import List
+
+MATCH_POINTS = 10
+
+
+class TurnEngine:
+    """Turn order and per-player totals for a shared board.
+
+    A player keeps the turn while they find matches and hands it to the next
+    player on a miss. Totals live in fixed-size unsigned arrays so the engine
+    stays small enough to keep one per room on the server, and it has no Qt
+    dependency so the GUI and the server share the same rules.
+    """
+    __slots__ = ('players', 'current', 'scores', 'moves')
+
+    def __init__(self, players: int = 2):
+        if players < 1:
+            raise ValueError('a game needs at least one player')
+        self.players = players
+        self.current = 0
+        self.scores = array('I', [0]) * players
+        self.moves = array('I', [0]) * players
+
+    def record(self, matched: bool, points: int = MATCH_POINTS) -> bool:
+        """Record the active player's move. Returns True if the turn passed."""
+        player = self.current
+        self.moves[player] += 1
+        if matched:
+            self.scores[player] += points
+            return False
+        self.current = (player + 1) % self.players
+        return self.players > 1
+
+    def leaders(self) -> List[int]:
+        """Players sharing the highest score."""
+        best = max(self.scores)
+        return [player for player, score in enumerate(self.scores) if score == best]
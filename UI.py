@@ -1,16 +1,35 @@
+import logging
+import math
 import sys
+from typing import Optional
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout,
                             QPushButton, QLabel, QVBoxLayout, QHBoxLayout,
-                            QMessageBox, QInputDialog, QStackedWidget, QSpacerItem, QSizePolicy)
-from PyQt5.QtCore import Qt, QTimer, QSize, QPoint
+                            QStackedWidget, QSpacerItem, QSizePolicy)
+from PyQt5.QtCore import Qt, QTimer, QSize, QPoint, QEvent
 from PyQt5.QtGui import QFont, QPalette, QColor
 from Game import MemoryGame
-from Utils import create_card_button, get_grid_size, ANIMATION_DURATION, CARD_BACK_COLOR, CARD_FRONT_COLOR
+from BotDriver import BotDriver
+from ParticleEffect import ParticleEffect
+from Utils import create_card_pairs, deal_seed, get_grid_size
 from Settings import Settings
+from Tracing import traced
+from Watchdog import StallWatchdog
 from SplashScreen import SplashScreen
 from MainMenu import MainMenu
 from SettingsScreen import SettingsScreen
 from ScoreboardScreen import ScoreboardScreen
+from GameCompleteOverlay import GameCompleteOverlay
+from CardBoard import CardBoard
+from Scheduler import Scheduler
+from SettingsWatcher import SettingsWatcher
+from SharedLeaderboard import SharedLeaderboard, PERSIST_INTERVAL
+from SaveGame import GameSaver
+from SymbolPack import SymbolPack, PACK_ERRORS
+
+logger = logging.getLogger(__name__)
+
+MAX_PLAYERS = 2
+PREPARE_BATCH = 8  # cards turned face down per idle slice
 
 class MemoryGameUI(QMainWindow):
     def __init__(self):
@@ -24,6 +43,22 @@ class MemoryGameUI(QMainWindow):
         self.card_grid = None
         self.game = None
         self.game_screen = None
+        self.bot_driver = None
+        self.players = 1
+        
+        # Delayed callbacks: window-wide ones, and the game's own, which are
+        # dropped whenever the game resets or the player leaves it
+        self.scheduler = Scheduler(self)
+        self.game_tasks = Scheduler(self)
+        self.flip_back_task = None
+        
+        # The next game's deal, a (seed, cards) pair, and board are prepared in idle time
+        self.next_deal = None
+        self.next_seed = None
+        self.next_grid_size = 0
+        self.prepare_timer = QTimer(self)
+        self.prepare_timer.setInterval(0)
+        self.prepare_timer.timeout.connect(self.prepare_step)
         
         # Create stacked widget for different screens
         self.stacked_widget = QStackedWidget()
@@ -34,6 +69,20 @@ class MemoryGameUI(QMainWindow):
             }
         """)
         self.setCentralWidget(self.stacked_widget)
+        self.stacked_widget.currentChanged.connect(self.update_activity)
+        
+        # Top scores shared with other instances on this machine, if enabled
+        self.leaderboard = None
+        if self.settings.get_setting('shared_leaderboard', False):
+            self.leaderboard = SharedLeaderboard(self.settings.settings_file)
+            self.persist_timer = QTimer(self)
+            self.persist_timer.timeout.connect(self.leaderboard.persist)
+            self.persist_timer.start(PERSIST_INTERVAL)
+        
+        # Card symbols and theme colours from a pack archive, if one is set;
+        # it is only opened when first needed
+        pack_path = self.settings.get_setting('symbol_pack')
+        self.symbol_pack = SymbolPack(pack_path) if pack_path else None
         
         # Initialize screens
         self.splash_screen = SplashScreen(self)
@@ -56,8 +105,22 @@ class MemoryGameUI(QMainWindow):
         # Connect settings screen signals
         self.settings_screen.settings_changed.connect(self.on_settings_changed)
         
+        # Follow changes other instances make to the settings file
+        self.settings_watcher = SettingsWatcher(self.settings.settings_file, self)
+        self.settings_watcher.changed.connect(self.settings_screen.refresh)
+        self.settings_watcher.changed.connect(self.scoreboard_screen.on_settings_file_changed)
+        # Only the theme: a game in progress keeps its board until the next one
+        self.settings_watcher.changed.connect(self.apply_theme)
+        
+        # A game left unfinished last time is dealt while the splash shows
+        # and resumed in its place of the main menu
+        self.saver = GameSaver.claim(self.settings.settings_file)
+        self.saved_game = self.saver.load()
+        if self.saved_game:
+            self.scheduler.call_later(0, self.prepare_saved_game)
+        
         # Start splash screen timer
-        QTimer.singleShot(2000, self.show_main_menu)  # Show main menu after 2 seconds
+        self.scheduler.call_later(2000, self.show_start_screen)  # Show main menu after 2 seconds
 
     @property
     def game_widget(self):
@@ -87,148 +150,273 @@ class MemoryGameUI(QMainWindow):
             header_layout = QHBoxLayout(header)
             header_layout.setContentsMargins(0, 0, 0, 0)
             
-            self.score_label = QLabel("Score: 0")
-            self.score_label.setProperty("class", "subtitle")
-            header_layout.addWidget(self.score_label)
-            
-            self.moves_label = QLabel("Moves: 0")
-            self.moves_label.setProperty("class", "subtitle")
-            header_layout.addWidget(self.moves_label)
+            # One score/moves pair per seat; extra seats stay hidden in solo games
+            self.score_labels = []
+            self.moves_labels = []
+            for player in range(MAX_PLAYERS):
+                score_label = QLabel("Score: 0")
+                score_label.setProperty("class", "subtitle")
+                header_layout.addWidget(score_label)
+                self.score_labels.append(score_label)
+                
+                moves_label = QLabel("Moves: 0")
+                moves_label.setProperty("class", "subtitle")
+                header_layout.addWidget(moves_label)
+                self.moves_labels.append(moves_label)
+            self.score_label = self.score_labels[0]
+            self.moves_label = self.moves_labels[0]
+            
+            self.turn_label = QLabel("")
+            self.turn_label.setProperty("class", "subtitle")
+            header_layout.addWidget(self.turn_label)
             
             layout.addWidget(header)
             
-            # Create grid container
-            grid_container = QWidget()
-            grid_container.setObjectName("grid_container")
-            self.card_grid = QGridLayout(grid_container)
-            self.card_grid.setSpacing(10)
-            layout.addWidget(grid_container)
+            # Two boards: one in play, the other dealt for the next game
+            self.board_stack = QStackedWidget()
+            self.board = CardBoard(self.on_card_clicked)
+            self.spare_board = CardBoard(self.on_card_clicked)
+            self.board_stack.addWidget(self.board)
+            self.board_stack.addWidget(self.spare_board)
+            self.card_grid = self.board.grid
+            layout.addWidget(self.board_stack)
             
             # Create back button
             back_btn = QPushButton("Back to Menu")
             back_btn.clicked.connect(self.show_main_menu)
             layout.addWidget(back_btn)
             
-            # Initialize game
-            self.game = MemoryGame(self)
+            # End-of-game panel drawn over the board
+            self.complete_overlay = GameCompleteOverlay(self.game_screen)
+            self.complete_overlay.submitted.connect(self.on_score_submitted)
+            self.complete_overlay.play_again.connect(self.reset_game)
+            self.complete_overlay.back_to_menu.connect(self.show_main_menu)
+            
+            # Initialize game; the clock timer and particles live on the UI side
+            self.game_timer = QTimer(self)
+            particle_effect = ParticleEffect(self.game_screen)
+            self.game = MemoryGame(self, players=self.players, timer=self.game_timer,
+                                   particle_effect=particle_effect)
+            # Attached after the first deal, which would clear a game still to be resumed
+            self.game.saver = self.saver
+            self.game_timer.timeout.connect(self.game.update_time)
             
             # Create initial cards
             self.create_cards()
 
-    def create_cards(self):
-        """Create cards based on current grid size."""
-        # Clear existing cards
-        if self.cards:
-            for card in self.cards:
-                self.card_grid.removeWidget(card)
-                card.deleteLater()
-            self.cards.clear()
-        
-        # Get current grid size
-        grid_size = self.settings.get_setting('grid_size', 4)
-        card_size = min(100, 1000 // (grid_size + 1))
-        
-        # Create new cards
-        for i in range(grid_size * grid_size):
-            row, col = divmod(i, grid_size)
-            card = create_card_button('?')
-            card.setFixedSize(card_size, card_size)
-            card.setFont(QFont('Arial', card_size // 2))
-            card.clicked.connect(lambda checked, idx=i: self.on_card_clicked(idx))
-            self.card_grid.addWidget(card, row, col)
-            self.cards.append(card)
-
-    def reset_game(self):
-        """Reset the game state."""
+    @traced('MemoryGameUI.create_cards')
+    def create_cards(self, grid_size: Optional[int] = None):
+        """Create cards for grid_size, by default the current setting."""
+        if grid_size is None:
+            grid_size = self.settings.get_setting('grid_size', 4)
+        self.board.build(grid_size)
+        self.cards = self.board.cards
+
+    def swap_boards(self):
+        """Bring the prepared spare board forward."""
+        self.board, self.spare_board = self.spare_board, self.board
+        self.board_stack.setCurrentWidget(self.board)
+        self.cards = self.board.cards
+        self.card_grid = self.board.grid
+
+    def prepare_next_board(self, grid_size: Optional[int] = None, seed: Optional[int] = None):
+        """Deal the next game and ready the spare board while the player is idle."""
+        if not self.game_screen:
+            return
+        self.next_deal = None
+        self.next_seed = seed
+        self.next_grid_size = grid_size or self.settings.get_setting('grid_size', 4)
+        self.prepare_timer.start()
+
+    def prepare_step(self):
+        """One idle slice of preparation; runs whenever the event queue is empty."""
+        spare = self.spare_board
+        if spare.grid_size != self.next_grid_size:
+            spare.build(self.next_grid_size)
+        elif not spare.reset_faces(PREPARE_BATCH):
+            return
+        elif self.next_deal is None:
+            seed = deal_seed() if self.next_seed is None else self.next_seed
+            self.next_deal = (seed, self.deal(self.next_grid_size, seed))
+            self.decode_faces(spare, self.next_deal[1])
+        else:
+            self.prepare_timer.stop()
+
+    def deal(self, grid_size: int, seed: int):
+        """Deal a board from the symbol pack, or the built-in symbols without one."""
+        return create_card_pairs(grid_size, seed, self.pack_call(lambda pack: pack.symbols()))
+
+    def decode_faces(self, board, cards):
+        """Start decoding the pack images of a deal before any card is turned."""
+        board.set_deal_faces(self.pack_call(
+            lambda pack: pack.decode(cards, board.card_size, board.devicePixelRatioF())))
+
+    def pack_call(self, use):
+        """use(symbol_pack), or None without a usable pack; a broken pack is dropped."""
+        if not self.symbol_pack:
+            return None
+        try:
+            return use(self.symbol_pack)
+        except PACK_ERRORS as e:
+            logger.warning("Ignoring symbol pack %s: %s", self.symbol_pack.path, e)
+            self.symbol_pack = None
+            return None
+
+    def reset_game(self, players: Optional[int] = None, seed: Optional[int] = None,
+                   grid_size: Optional[int] = None):
+        """Reset the game state, optionally switching the number of players.
+
+        A seed deals a reproducible board, e.g. for replaying a click script
+        or resuming a saved game; grid_size overrides the setting for it.
+        """
+        if players is not None:
+            self.players = players
         if not self.game_screen:
             self.setup_game_screen()
-        self.create_cards()
+        for player in range(MAX_PLAYERS):
+            self.score_labels[player].setVisible(player < self.players)
+            self.moves_labels[player].setVisible(player < self.players)
+        self.turn_label.setVisible(self.players > 1)
+        self.complete_overlay.hide()
+        self.prepare_timer.stop()
+        self.game_tasks.cancel_all()
+        
+        # Play again is a swap when the next board is ready; another seed
+        # or a changed grid size builds the board now
+        if grid_size is None:
+            grid_size = self.settings.get_setting('grid_size', 4)
+        if (self.next_deal is not None and seed in (None, self.next_deal[0])
+                and self.spare_board.is_ready(grid_size)):
+            seed, deal = self.next_deal
+            self.swap_boards()
+        else:
+            if seed is None:
+                seed = deal_seed()
+            deal = self.deal(grid_size, seed)
+            self.create_cards(grid_size)
+            self.decode_faces(self.board, deal)
+        self.next_deal = None
         if self.game:
-            self.game.reset_game()
+            self.game.players = self.players
+            self.game.reset_game(seed, deal)
         self.stacked_widget.setCurrentWidget(self.game_screen)
+        self.update_activity()
+
+    def update_activity(self, *args):
+        """Run the game's clock and effects only while the player can see them."""
+        if not self.game:
+            return
+        if self.isMinimized() or self.stacked_widget.currentWidget() is not self.game_screen:
+            self.game.pause()
+            if self.bot_driver:
+                self.bot_driver.pause()
+        else:
+            self.game.resume()
+            if self.bot_driver:
+                self.bot_driver.resume()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.update_activity()
+
+    def closeEvent(self, event):
+        if self.leaderboard:
+            self.leaderboard.persist()
+            self.leaderboard.close()  # the segment stays for other instances
+            self.leaderboard = self.scoreboard_screen.leaderboard = None
+        super().closeEvent(event)
+
+    def start_bot(self, strategy, interval: int = 300):
+        """Let a bot strategy play the current game at the given cadence (ms)."""
+        if not self.game_screen:
+            self.reset_game()
+        if self.bot_driver:
+            self.bot_driver.stop()
+        self.bot_driver = BotDriver(self.game, strategy, interval)
+        self.bot_driver.start()
 
     def on_card_clicked(self, index):
         """Handle card click events."""
         self.game.handle_card_click(index)
 
+    @traced('MemoryGameUI.flip_card')
     def flip_card(self, index: int, symbol: str, is_front: bool):
         """Flip a card to show or hide its symbol."""
-        card = self.cards[index]
-        if is_front:
-            card.setText(symbol)
-            card.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {CARD_FRONT_COLOR};
-                    color: black;
-                    border-radius: 8px;
-                    border: none;
-                    font-size: {card.height() // 2}px;
-                }}
-            """)
+        self.board.set_face(index, symbol, is_front)
+
+    def update_score(self, score: int, player: Optional[int] = None):
+        """Update the score display, only touching the given player's label."""
+        if player is None:
+            self.score_label.setText(f'Score: {score}')
         else:
-            card.setText('?')
-            card.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {CARD_BACK_COLOR};
-                    color: white;
-                    border-radius: 8px;
-                    border: none;
-                    font-size: {card.height() // 2}px;
-                }}
-                QPushButton:hover {{
-                    background-color: #357abd;
-                }}
-            """)
-
-    def update_score(self, score: int):
-        """Update the score display."""
-        self.score_label.setText(f'Score: {score}')
-
-    def update_moves(self, moves: int):
-        """Update the moves counter."""
-        self.moves_label.setText(f'Moves: {moves}')
+            self.score_labels[player].setText(f'P{player + 1} Score: {score}')
+
+    def update_moves(self, moves: int, player: Optional[int] = None):
+        """Update the moves counter, only touching the given player's label."""
+        if player is None:
+            self.moves_label.setText(f'Moves: {moves}')
+        else:
+            self.moves_labels[player].setText(f'P{player + 1} Moves: {moves}')
+
+    def update_turn(self, player: int):
+        """Show whose turn it is."""
+        self.turn_label.setText(f"Player {player + 1}'s turn")
 
     def reset_cards(self):
-        """Reset all cards to their initial state."""
-        for card in self.cards:
-            card.setText('?')
-            card.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {CARD_BACK_COLOR};
-                    color: white;
-                    border-radius: 8px;
-                    border: none;
-                    font-size: {card.height() // 2}px;
-                }}
-                QPushButton:hover {{
-                    background-color: #357abd;
-                }}
-            """)
+        """Turn every face-up card back down."""
+        self.board.reset_faces()
 
     def schedule_card_flip_back(self, card_indices):
-        """Schedule cards to flip back after a delay."""
-        QTimer.singleShot(ANIMATION_DURATION, self.game.flip_cards_back)
+        """Flip cards back after a delay matched to the player's pace."""
+        self.flip_back_task = self.game_tasks.call_later(self.game.flip_back_delay, self.game.flip_cards_back)
+
+    def cancel_card_flip_back(self):
+        """Drop a pending flip-back; the game resolves it itself."""
+        if self.flip_back_task:
+            self.flip_back_task.cancel()
 
     def show_game_complete(self):
-        """Show game completion message and prompt for name."""
-        name, ok = QInputDialog.getText(
-            self, 'Game Complete!',
-            'Enter your name for the scoreboard:',
-            text='Player'
-        )
-        
-        if ok and name:
-            self.settings.add_score(name, self.game.moves, self.game.time)
-            self.scoreboard_screen.update_scores(name, self.game.moves, self.game.time)
-            
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Information)
-            msg.setWindowTitle("Congratulations!")
-            msg.setText(f"You completed the game in {self.game.moves} moves!\n"
-                       f"Final score: {self.game.score}")
-            msg.setStandardButtons(QMessageBox.Ok)
-            msg.exec_()
+        """Show the results over the board and ask for a scoreboard name."""
+        if self.game.turns:
+            self.show_multiplayer_result()
+            return
+
+        self.complete_overlay.show_result(
+            "Congratulations!",
+            f"You completed the game in {self.game.moves} moves!\n"
+            f"Final score: {self.game.score}\n"
+            f"Efficiency vs. perfect memory: {self.game.efficiency:.0%}")
+        # Keep the celebration visible above the panel
+        self.game.particle_effect.raise_()
+        self.prepare_next_board()
+
+    def show_multiplayer_result(self):
+        """Announce the winner of a multiplayer game."""
+        turns = self.game.turns
+        leaders = turns.leaders()
+        if len(leaders) == 1:
+            headline = f"Player {leaders[0] + 1} wins!"
+        else:
+            headline = "It's a draw!"
+        totals = "\n".join(f"Player {player + 1}: {score} points in {moves} moves"
+                           for player, (score, moves) in enumerate(zip(turns.scores, turns.moves)))
+        self.complete_overlay.show_result(headline, totals, ask_name=False)
+        self.game.particle_effect.raise_()
+        self.prepare_next_board()
+
+    def on_score_submitted(self, name: str):
+        """Record the finished game; the write itself happens in the background."""
+        grid_size = math.isqrt(len(self.game.cards))
+        entry = self.settings.add_score(name, self.game.moves, self.game.time, grid_size)
+        rank = None
+        if self.leaderboard:
+            # The same entry, timestamp included, so both copies dedupe as one game
+            rank = self.leaderboard.insert(entry)
+        status = f"Saved score for {name}"
+        self.complete_overlay.show_status(f"{status} (#{rank})" if rank else status)
 
+    @traced('MemoryGameUI.apply_theme')
     def apply_theme(self):
         """Apply the current theme to the application."""
         is_dark_mode = self.settings.get_setting('dark_mode', False)
@@ -264,6 +452,7 @@ class MemoryGameUI(QMainWindow):
                 'success': '#4CAF50',
                 'warning': '#ffc107'
             }
+        colors.update(self.pack_call(lambda pack: pack.theme(is_dark_mode)) or {})
         
         # Define font sizes
         fonts = {
@@ -463,11 +652,9 @@ class MemoryGameUI(QMainWindow):
                         }}
                     """)
             
-            # Update score and moves labels
-            if hasattr(self, 'score_label'):
-                self.score_label.setStyleSheet(f"color: {colors['text']}; font-size: {fonts['body']};")
-            if hasattr(self, 'moves_label'):
-                self.moves_label.setStyleSheet(f"color: {colors['text']}; font-size: {fonts['body']};")
+            # Update score, moves and turn labels
+            for label in self.score_labels + self.moves_labels + [self.turn_label]:
+                label.setStyleSheet(f"color: {colors['text']}; font-size: {fonts['body']};")
         
         # Force update of all child widgets
         for widget in self.findChildren(QWidget):
@@ -500,10 +687,34 @@ class MemoryGameUI(QMainWindow):
         for widget in self.findChildren(QWidget):
             widget.update()
 
+    def prepare_saved_game(self):
+        """Build and deal the saved game's board on the spare board while the splash shows."""
+        self.setup_game_screen()
+        self.prepare_next_board(self.saved_game.grid_size, self.saved_game.seed)
+
+    def show_start_screen(self):
+        """Leave the splash for the saved game if there is one, else the main menu."""
+        if self.saved_game:
+            self.resume_saved_game()
+        else:
+            self.show_main_menu()
+
+    @traced('MemoryGameUI.resume_saved_game')
+    def resume_saved_game(self):
+        """Put the unfinished game from last time back on screen."""
+        snapshot, self.saved_game = self.saved_game, None
+        self.reset_game(players=1, seed=snapshot.seed, grid_size=snapshot.grid_size)
+        self.game.restore(snapshot)
+        self.game_screen.setFocus()
+
     def show_main_menu(self):
         """Show the main menu screen."""
+        if self.bot_driver:
+            self.bot_driver.stop()
+        self.game_tasks.cancel_all()
         self.stacked_widget.setCurrentWidget(self.main_menu)
         self.main_menu.setFocus()
+        self.prepare_next_board()
 
     def show_settings(self):
         """Show the settings screen."""
@@ -525,8 +736,13 @@ class MemoryGameUI(QMainWindow):
 def main():
     app = QApplication(sys.argv)
     window = MemoryGameUI()
+    watchdog = StallWatchdog(parent=window)
+    watchdog.start()
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    watchdog.stop()
+    Settings.flush()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -1,45 +1,58 @@
 import random
-from typing import List, Tuple
-from PyQt5.QtWidgets import QPushButton
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
+from typing import List, Optional, Tuple
 from Settings import Settings
 
 # Game constants
 CARD_SYMBOLS = ['🎮', '🎲', '🎯', '🎨', '🎭', '🎪', '🎫', '🎪', '🎭', '🎪', '🎫', '🎪', 
                 '🎮', '🎲', '🎯', '🎨', '🎭', '🎪', '🎫', '🎪', '🎭', '🎪', '🎫', '🎪']
+SPLASH_SYMBOLS = ['😀', '😂', '😎', '👍']
 CARD_BACK_COLOR = '#4a90e2'  # Nice blue color
 CARD_FRONT_COLOR = '#ffffff'  # White
 CARD_SIZE = 100
 ANIMATION_DURATION = 500  # milliseconds
+MIN_FLIP_BACK = 150  # fastest flip-back (ms) for quick players
 
 def get_grid_size() -> int:
     """Get the current grid size from settings."""
     settings = Settings()
     return settings.get_setting('grid_size', 4)
 
-def create_card_pairs() -> List[str]:
-    """Create pairs of card symbols based on grid size."""
-    settings = Settings()
-    grid_size = settings.get_setting('grid_size', 4)
+def deal_seed() -> int:
+    """A fresh seed for create_card_pairs, so any deal can be recreated later."""
+    return random.getrandbits(32)
+
+def create_card_pairs(grid_size: Optional[int] = None, seed: Optional[int] = None,
+                      card_symbols: Optional[List[str]] = None) -> List[str]:
+    """Create pairs of card symbols based on grid size.
+
+    The grid size defaults to the current setting. Passing a seed makes the
+    deal reproducible without touching the global random state.
+    card_symbols replaces CARD_SYMBOLS, e.g. with a pack's symbols.
+    """
+    if not card_symbols:
+        card_symbols = CARD_SYMBOLS
+    if grid_size is None:
+        settings = Settings()
+        grid_size = settings.get_setting('grid_size', 4)
+    rng = random.Random(seed) if seed is not None else random
     total_cards = grid_size * grid_size
     pairs_needed = total_cards // 2
     
     # Ensure we have enough symbols
-    if pairs_needed > len(CARD_SYMBOLS):
+    if pairs_needed > len(card_symbols):
         # If we need more symbols than available, repeat the symbols
-        symbols = CARD_SYMBOLS * (pairs_needed // len(CARD_SYMBOLS) + 1)
+        symbols = card_symbols * (pairs_needed // len(card_symbols) + 1)
     else:
-        symbols = CARD_SYMBOLS
+        symbols = card_symbols
     
     # Get random symbols for pairs
-    selected_symbols = random.sample(symbols, pairs_needed)
+    selected_symbols = rng.sample(symbols, pairs_needed)
     
     # Create pairs
     cards = selected_symbols * 2
     
     # Shuffle the cards
-    random.shuffle(cards)
+    rng.shuffle(cards)
     
     return cards
 
@@ -50,24 +63,6 @@ def get_card_position(index: int) -> Tuple[int, int]:
     col = index % grid_size
     return (row, col)
 
-def create_card_button(symbol: str) -> QPushButton:
-    """Create a styled card button."""
-    button = QPushButton('?')
-    button.setFixedSize(CARD_SIZE, CARD_SIZE)
-    button.setFont(QFont('Arial', 24))
-    button.setStyleSheet(f"""
-        QPushButton {{
-            background-color: {CARD_BACK_COLOR};
-            color: white;
-            border-radius: 8px;
-            border: none;
-        }}
-        QPushButton:hover {{
-            background-color: #357abd;
-        }}
-    """)
-    return button
-
 def format_time(seconds: int) -> str:
     """Format seconds into MM:SS format."""
     minutes = seconds // 60
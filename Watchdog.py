@@ -0,0 +1,86 @@
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+from PyQt5.QtCore import QObject, QTimer
+import Metrics
+import Tracing
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 50  # milliseconds between heartbeats on the GUI thread
+STALL_THRESHOLD = 250  # milliseconds of lag before a stall is reported
+
+
+class StallWatchdog(QObject):
+    """Detect Qt event-loop stalls from a monitor thread.
+
+    A QTimer on the GUI thread records a heartbeat. A background thread
+    checks how long ago the last one was. When the event loop falls more
+    than the threshold behind, the thread captures the main thread's Python
+    stack and logs it. When the loop catches up, it logs the total stall
+    time. Both go into Metrics, and each stall is added as a span to any
+    active trace.
+    """
+
+    def __init__(self, threshold: int = STALL_THRESHOLD, interval: int = HEARTBEAT_INTERVAL,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.threshold = threshold / 1000
+        self.interval = interval / 1000
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.stall_started: Optional[float] = None
+        self.stopping = threading.Event()
+        self.monitor: Optional[threading.Thread] = None
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(interval)
+        self.heartbeat.timeout.connect(self.beat)
+
+    def start(self) -> None:
+        self.last_beat = time.monotonic()
+        self.stopping.clear()
+        self.heartbeat.start()
+        self.monitor = threading.Thread(target=self.watch, name='stall-watchdog', daemon=True)
+        self.monitor.start()
+
+    def stop(self) -> None:
+        self.heartbeat.stop()
+        self.stopping.set()
+        if self.monitor:
+            self.monitor.join()
+            self.monitor = None
+
+    def beat(self) -> None:
+        """Runs on the GUI thread whenever the event loop gets to the timer."""
+        self.last_beat = time.monotonic()
+
+    def watch(self) -> None:
+        """Monitor thread loop."""
+        while not self.stopping.wait(self.interval):
+            now = time.monotonic()
+            lag = now - self.last_beat - self.interval
+            if lag > self.threshold and self.stall_started is None:
+                self.stall_started = self.last_beat + self.interval
+                self.report_stall(lag)
+            elif lag <= self.threshold and self.stall_started is not None:
+                self.report_recovery(self.last_beat)
+
+    def report_stall(self, lag: float) -> None:
+        """Log the main thread's stack while it is still stuck."""
+        Metrics.increment('event_loop.stalls')
+        frame = sys._current_frames().get(self.main_thread_id)
+        stack = ''.join(traceback.format_stack(frame)) if frame else '<no main thread frame>\n'
+        logger.warning('Event loop stalled for %.0f ms so far; main thread stack:\n%s',
+                       lag * 1000, stack)
+
+    def report_recovery(self, resumed: float) -> None:
+        duration = resumed - self.stall_started
+        Metrics.observe('event_loop.stall_ms', duration * 1000)
+        if Tracing.enabled:
+            start_ns = time.perf_counter_ns() - int((time.monotonic() - self.stall_started) * 1e9)
+            Tracing.record('event_loop.stall', start_ns, int(duration * 1e9))
+        logger.warning('Event loop recovered after a %.0f ms stall', duration * 1000)
+        self.stall_started = None
@@ -0,0 +1,5 @@
+"""Micro-benchmarks for the memory game.
+
+Run them with ``python -m benchmarks run`` from the project root and compare
+two saved runs with ``python -m benchmarks compare``.
+"""
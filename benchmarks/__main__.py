@@ -0,0 +1,53 @@
+import argparse
+import json
+import os
+import sys
+
+# Qt benchmarks must never need a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import runner
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Memory game benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='run benchmarks')
+    run.add_argument('names', nargs='*', help='only run benchmarks starting with these prefixes')
+    run.add_argument('--repeat', type=int, default=runner.DEFAULT_REPEAT)
+    run.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    interact = sub.add_parser('interact', help='time real clicks in the game window')
+    interact.add_argument('--games', type=int, default=3)
+    interact.add_argument('--grid-size', type=int, default=4)
+    interact.add_argument('--seed', type=int, default=0)
+    interact.add_argument('--script', metavar='PATH',
+                          help='JSON list of card indices to click instead of a seeded bot')
+    interact.add_argument('--save', metavar='PATH', help='write the report as JSON')
+    compare = sub.add_parser('compare', help='compare two saved runs')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10,
+                         help='fractional slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        report = runner.run(args.names, args.repeat)
+        if args.save:
+            runner.save(report, os.path.abspath(args.save))
+    elif args.command == 'interact':
+        from benchmarks.interaction import load_script, run_interaction
+        script = load_script(args.script) if args.script else None
+        report = run_interaction(args.games, args.grid_size, args.seed, script)
+        print(json.dumps(report, indent=4))
+        if args.save:
+            runner.save(report, args.save)
+    else:
+        regressions = runner.compare(runner.load(args.baseline), runner.load(args.current),
+                                     args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import itertools
+from benchmarks.runner import benchmark
+from Bot import HeadlessUI, BotPlayer, PerfectMemoryStrategy
+from Game import MemoryGame
+from Settings import Settings
+from Utils import create_card_pairs
+
+GRID_SIZES = (4, 6, 10)
+
+
+def deal_benchmark(grid_size):
+    def setup():
+        return (lambda: create_card_pairs(grid_size)), 1
+    return setup
+
+
+for _grid_size in GRID_SIZES:
+    benchmark(f'deal.create_card_pairs[{_grid_size}x{_grid_size}]')(deal_benchmark(_grid_size))
+
+
+@benchmark('deal.create_card_pairs[from settings]')
+def bench_deal_from_settings():
+    Settings().set_setting('grid_size', 4)
+    return create_card_pairs, 1
+
+
+@benchmark('settings.get_setting')
+def bench_get_setting():
+    settings = Settings()
+    return (lambda: settings.get_setting('grid_size', 4)), 1
+
+
+@benchmark('settings.set_setting')
+def bench_set_setting():
+    settings = Settings()
+    values = itertools.cycle([True, False])
+    return (lambda: settings.set_setting('dark_mode', next(values))), 1
+
+
+@benchmark('settings.add_score')
+def bench_add_score():
+    settings = Settings()
+    counter = itertools.count()
+
+    def add_score():
+        n = next(counter)
+        settings.add_score('bench', n % 50, n % 300)
+    return add_score, 1
+
+
+def click_benchmark(grid_size):
+    def setup():
+        # Record a perfect-memory game once, then replay its clicks
+        ui = HeadlessUI()
+        game = MemoryGame(ui, headless=True, grid_size=grid_size, seed=1)
+        ui.game = game
+        clicks = []
+        original = game.handle_card_click
+
+        def recording_click(index):
+            clicks.append(index)
+            original(index)
+        game.handle_card_click = recording_click
+        bot = BotPlayer(game, PerfectMemoryStrategy(1))
+        while bot.step():
+            pass
+        game.handle_card_click = original
+
+        def replay():
+            game.reset_game(1)
+            for index in clicks:
+                game.handle_card_click(index)
+        return replay, len(clicks)
+    return setup
+
+
+for _grid_size in GRID_SIZES:
+    benchmark(f'engine.handle_card_click[{_grid_size}x{_grid_size}]')(click_benchmark(_grid_size))
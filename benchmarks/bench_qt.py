@@ -0,0 +1,90 @@
+from PyQt5.QtCore import QEvent
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+from benchmarks.runner import benchmark
+from ParticleEffect import Particle, ParticleEffect
+from Settings import Settings
+from SymbolAtlas import SymbolAtlas, atlas_symbols
+from Utils import CARD_SIZE
+
+PARTICLE_COUNTS = (50, 500, 5000)
+GRID_SIZES = (4, 6, 10)
+FRAMES_PER_BURST = 50  # particles live for roughly 70-200 frames
+
+
+_app = None
+
+
+def application() -> QApplication:
+    """The shared QApplication, kept referenced for the whole run."""
+    global _app
+    if _app is None:
+        _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+def particle_benchmark(count):
+    def setup():
+        application()
+        effect = ParticleEffect()
+        effect.resize(1000, 800)
+        target = QImage(effect.size(), QImage.Format_ARGB32_Premultiplied)
+
+        def frames():
+            # Set particles directly rather than emit() to avoid the fade timer
+            effect.particles = [Particle(500, 400, '#4CAF50') for _ in range(count)]
+            for _ in range(FRAMES_PER_BURST):
+                effect.render(target)
+        return frames, FRAMES_PER_BURST
+    return setup
+
+
+for _count in PARTICLE_COUNTS:
+    benchmark(f'render.particle_frame[{_count}]')(particle_benchmark(_count))
+
+
+@benchmark('render.symbol_atlas[build]')
+def atlas_build_benchmark():
+    # Repeats hit Qt's glyph cache; the first build in a process is far slower
+    application()
+    symbols = atlas_symbols()
+    return lambda: SymbolAtlas.build(CARD_SIZE, 1.0, symbols), 1
+
+
+def window(grid_size):
+    """A game window with the game screen built for grid_size."""
+    from UI import MemoryGameUI
+    app = application()
+    Settings().set_setting('grid_size', grid_size)
+    ui = MemoryGameUI()
+    ui.reset_game()
+    app.processEvents()
+    return app, ui
+
+
+def create_cards_benchmark(grid_size):
+    def setup():
+        app, ui = window(grid_size)
+
+        def create_cards():
+            ui.create_cards()
+            # Old cards are removed with deleteLater(); count their deletion too
+            app.sendPostedEvents(None, QEvent.DeferredDelete)
+        return create_cards, 1
+    return setup
+
+
+def reset_game_benchmark(grid_size):
+    def setup():
+        app, ui = window(grid_size)
+
+        def reset_game():
+            ui.reset_game()
+            app.sendPostedEvents(None, QEvent.DeferredDelete)
+        return reset_game, 1
+    return setup
+
+
+for _grid_size in GRID_SIZES:
+    benchmark(f'ui.create_cards[{_grid_size}x{_grid_size}]')(create_cards_benchmark(_grid_size))
+    benchmark(f'ui.reset_game[{_grid_size}x{_grid_size}]')(reset_game_benchmark(_grid_size))
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence
+from PyQt5.QtCore import QEvent, QObject
+from PyQt5.QtWidgets import QApplication
+from Bot import BotPlayer, PerfectMemoryStrategy
+from Scheduler import live_count
+from Settings import Settings
+
+CLICK_TIMEOUT = 2.0  # seconds to wait for a card to repaint
+GAME_TIMEOUT = 120.0  # seconds before a game is abandoned
+HISTOGRAM_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 250)
+BURST_GAP_MS = 1000  # a longer pause between particle paints starts a new burst
+
+
+class PaintRecorder(QObject):
+    """Event filter that timestamps the paints of the widgets it watches once they finish."""
+
+    def __init__(self):
+        super().__init__()
+        self.paints: Dict[QObject, List[float]] = {}
+
+    def watch(self, widget) -> None:
+        self.paints.setdefault(widget, [])
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and obj in self.paints:
+            # Deliver the paint here, so the timestamp is taken once it is done
+            obj.event(event)
+            self.paints[obj].append(time.perf_counter())
+            return True
+        return False
+
+    def painted_since(self, widget, since: float) -> bool:
+        paints = self.paints.get(widget)
+        return bool(paints) and paints[-1] >= since
+
+
+def percentiles(samples: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of samples given in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+    return {'count': len(ordered), 'p50': pick(0.50), 'p95': pick(0.95),
+            'p99': pick(0.99), 'max': ordered[-1]}
+
+
+def histogram(samples: Sequence[float], buckets: Sequence[float] = HISTOGRAM_BUCKETS_MS) -> Dict[str, int]:
+    """Count samples (ms) per bucket, keyed by the bucket's upper bound."""
+    counts = {f'<={bound}ms': 0 for bound in buckets}
+    counts[f'>{buckets[-1]}ms'] = 0
+    for sample in samples:
+        for bound in buckets:
+            if sample <= bound:
+                counts[f'<={bound}ms'] += 1
+                break
+        else:
+            counts[f'>{buckets[-1]}ms'] += 1
+    return counts
+
+
+class InteractionHarness:
+    """Play real games in MemoryGameUI and time what the player would see."""
+
+    def __init__(self, grid_size: int = 4):
+        from UI import MemoryGameUI
+        self.app = QApplication.instance() or QApplication([])
+        Settings().set_setting('grid_size', grid_size)
+        self.ui = MemoryGameUI()
+        self.ui.show()
+        self.recorder = PaintRecorder()
+        self.click_latencies: List[float] = []
+        self.frame_times: List[float] = []
+        self.game_times: List[float] = []
+        # Boot normally: wait for the splash screen to hand over to the menu
+        while self.ui.stacked_widget.currentWidget() is not self.ui.main_menu:
+            self.pump()
+
+    def pump(self) -> None:
+        self.app.processEvents()
+        time.sleep(0.0005)
+
+    def click(self, index: int) -> None:
+        """Click a card and wait until its next paint has completed."""
+        card = self.ui.cards[index]
+        start = time.perf_counter()
+        self.ui.on_card_clicked(index)
+        while not self.recorder.painted_since(card, start):
+            if time.perf_counter() - start > CLICK_TIMEOUT:
+                return
+            self.pump()
+        self.click_latencies.append((time.perf_counter() - start) * 1000)
+
+    def wait_idle(self) -> None:
+        """Let a pending flip-back finish before the next click."""
+        while self.ui.game.is_processing:
+            self.pump()
+
+    def play(self, seed: int, script: Optional[Sequence[int]] = None) -> None:
+        """Play one game from a click script, or with a seeded perfect-memory bot."""
+        self.ui.reset_game(seed=seed)
+        self.pump()
+        game = self.ui.game
+        for card in self.ui.cards:
+            self.recorder.watch(card)
+        particles = game.particle_effect
+        self.recorder.watch(particles)
+        self.recorder.paints[particles].clear()
+
+        bot = BotPlayer(game, PerfectMemoryStrategy(seed), click=self.click)
+        start = time.perf_counter()
+        clicks = iter(script) if script is not None else None
+        while not game.is_complete() and time.perf_counter() - start < GAME_TIMEOUT:
+            self.wait_idle()
+            if clicks is None:
+                bot.step()
+            else:
+                index = next(clicks, None)
+                if index is None:
+                    break
+                self.click(index)
+        self.game_times.append((time.perf_counter() - start) * 1000)
+
+        # Let the celebration burst play out, then collect frame times from
+        # every burst of the game
+        settle = time.perf_counter()
+        while particles.particles and time.perf_counter() - settle < 5:
+            self.pump()
+        paints = self.recorder.paints[particles]
+        intervals = ((b - a) * 1000 for a, b in zip(paints, paints[1:]))
+        self.frame_times.extend(ms for ms in intervals if ms < BURST_GAP_MS)
+
+    def report(self) -> Dict:
+        return {
+            'click_to_paint_ms': percentiles(self.click_latencies),
+            'click_to_paint_histogram': histogram(self.click_latencies),
+            'particle_frame_ms': percentiles(self.frame_times),
+            'particle_frame_histogram': histogram(self.frame_times),
+            'game_ms': percentiles(self.game_times),
+            # Delayed callbacks still pending after the last game; should not
+            # grow with the number of games played
+            'live_tasks': live_count(),
+        }
+
+
+def run_interaction(games: int = 3, grid_size: int = 4, seed: int = 0,
+                    script: Optional[Sequence[int]] = None) -> Dict:
+    """Play `games` games in a scratch directory and return the timing report."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            harness = InteractionHarness(grid_size)
+            for game in range(games):
+                harness.play(seed + game, script)
+            return harness.report()
+        finally:
+            os.chdir(cwd)
+
+
+def load_script(path: str) -> List[int]:
+    """A click script is a JSON list of card indices."""
+    with open(path, 'r') as f:
+        return [int(index) for index in json.load(f)]
@@ -0,0 +1,111 @@
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# A benchmark is a setup function returning (operation, ops_per_call). The
+# operation is timed repeatedly; ops_per_call lets one call stand for many
+# operations (e.g. a replayed game standing for each of its clicks).
+Setup = Callable[[], Tuple[Callable[[], None], int]]
+
+BENCHMARKS: Dict[str, Setup] = {}
+
+DEFAULT_REPEAT = 7
+MIN_ROUND_TIME = 0.05  # seconds per timed round
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """Register a benchmark setup function under name."""
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def calibrate(operation: Callable[[], None]) -> int:
+    """Find how many calls make one round last at least MIN_ROUND_TIME."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        if time.perf_counter() - start >= MIN_ROUND_TIME or number >= 1 << 20:
+            return number
+        number *= 2
+
+
+def measure(setup: Setup, repeat: int = DEFAULT_REPEAT) -> Dict[str, float]:
+    """Time one benchmark and return per-operation statistics in microseconds."""
+    operation, ops_per_call = setup()
+    number = calibrate(operation)
+    rounds: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        rounds.append((time.perf_counter() - start) / (number * ops_per_call) * 1e6)
+    return {
+        'min_us': min(rounds),
+        'median_us': statistics.median(rounds),
+        'ops': number * ops_per_call * repeat,
+    }
+
+
+def run(selected: Optional[List[str]] = None, repeat: int = DEFAULT_REPEAT) -> Dict:
+    """Run the selected benchmarks (all by default) in a scratch directory.
+
+    Settings are read from the working directory, so running from a temporary
+    one keeps the real settings.json and scoreboard untouched.
+    """
+    # Importing the suites registers their benchmarks
+    from benchmarks import bench_core, bench_qt  # noqa: F401
+
+    names = [name for name in BENCHMARKS
+             if not selected or any(name.startswith(prefix) for prefix in selected)]
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name in names:
+                results[name] = measure(BENCHMARKS[name], repeat)
+                print(f"{name:45} {results[name]['median_us']:12.2f} us")
+        finally:
+            os.chdir(cwd)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def save(report: Dict, path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=4)
+
+
+def load(path: str) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """Print a comparison and return the benchmarks slower than the threshold."""
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f"{name:45} {'new':>12}")
+            continue
+        change = result['median_us'] / before['median_us'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:45} {before['median_us']:12.2f} -> {result['median_us']:12.2f} us "
+              f"({change:+.1%}){flag}")
+    return regressions